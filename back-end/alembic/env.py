@@ -46,6 +46,7 @@ from app.models.contest import Contest # Added missing model import
 from app.models.message import Message # Added missing model import
 from app.models.skill import Skill # Added missing model import
 from app.models.interest import Interest # Added missing model import
+from app.models.recommendation import UserRecommendation, UserMatchWeights, MatchInteraction, UserInteractionStats, RecsysWatermark
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,32 @@
+"""Add per-user match weights table
+
+Revision ID: 1234567890b3
+Revises: 1234567890b2
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1234567890b3'
+down_revision = '1234567890b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_match_weights',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('w_major', sa.Float(), nullable=False),
+    sa.Column('w_skills', sa.Float(), nullable=False),
+    sa.Column('w_interests', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_match_weights')
@@ -0,0 +1,58 @@
+"""Add match interaction log, per-user interaction stats and watermarks
+
+Revision ID: 1234567890b4
+Revises: 1234567890b3
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1234567890b4'
+down_revision = '1234567890b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('match_interactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('other_id', sa.Integer(), nullable=False),
+    sa.Column('label', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['other_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_match_interactions_id'), 'match_interactions', ['id'], unique=False)
+    op.create_table('user_interaction_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('pos_count', sa.Integer(), nullable=False),
+    sa.Column('neg_count', sa.Integer(), nullable=False),
+    sa.Column('pos_major', sa.Float(), nullable=False),
+    sa.Column('pos_skills', sa.Float(), nullable=False),
+    sa.Column('pos_interests', sa.Float(), nullable=False),
+    sa.Column('neg_major', sa.Float(), nullable=False),
+    sa.Column('neg_skills', sa.Float(), nullable=False),
+    sa.Column('neg_interests', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('recsys_watermarks',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('recsys_watermarks')
+    op.drop_table('user_interaction_stats')
+    op.drop_index(op.f('ix_match_interactions_id'), table_name='match_interactions')
+    op.drop_table('match_interactions')
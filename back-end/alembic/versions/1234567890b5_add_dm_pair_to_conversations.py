@@ -0,0 +1,52 @@
+"""Add canonical DM participant pair to conversations
+
+Revision ID: 1234567890b5
+Revises: 1234567890b4
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1234567890b5'
+down_revision = '1234567890b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('dm_user_low_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('dm_user_high_id', sa.Integer(), nullable=True))
+
+    # 기존 DM 대화방 backfill. 같은 두 사람의 DM이 여러 개면 가장 먼저 만들어진 방만 키를 가짐
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT cp.conversation_id, MIN(cp.user_id), MAX(cp.user_id) "
+        "FROM conversation_participant cp "
+        "JOIN conversations c ON c.id = cp.conversation_id "
+        "WHERE c.type = 'DM' "
+        "GROUP BY cp.conversation_id "
+        "HAVING COUNT(*) = 2 "
+        "ORDER BY cp.conversation_id"
+    )).fetchall()
+    seen = set()
+    for conversation_id, low_id, high_id in rows:
+        if (low_id, high_id) in seen:
+            continue
+        seen.add((low_id, high_id))
+        conn.execute(
+            sa.text("UPDATE conversations SET dm_user_low_id = :low, dm_user_high_id = :high WHERE id = :id"),
+            {"low": low_id, "high": high_id, "id": conversation_id},
+        )
+
+    op.create_index('ix_conversations_dm_pair', 'conversations', ['dm_user_low_id', 'dm_user_high_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_conversations_dm_pair', table_name='conversations')
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_column('dm_user_high_id')
+        batch_op.drop_column('dm_user_low_id')
@@ -0,0 +1,77 @@
+"""Replace messages.read_by with per-participant read watermarks
+
+Revision ID: 1234567890b6
+Revises: 1234567890b5
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1234567890b6'
+down_revision = '1234567890b5'
+branch_labels = None
+depends_on = None
+
+
+def _user_ids(read_by):
+    if read_by is None:
+        return []
+    if isinstance(read_by, str):
+        read_by = json.loads(read_by)
+    return [int(u) for u in read_by]
+
+
+def upgrade():
+    with op.batch_alter_table('conversation_participant', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_read_message_id', sa.Integer(), nullable=True))
+
+    # 참여자별로 read_by에 들어있던 가장 큰 메시지 id를 watermark로 사용
+    conn = op.get_bind()
+    watermarks = {}
+    for message_id, conversation_id, read_by in conn.execute(
+        sa.text("SELECT id, conversation_id, read_by FROM messages")
+    ).fetchall():
+        for user_id in _user_ids(read_by):
+            key = (conversation_id, user_id)
+            watermarks[key] = max(watermarks.get(key, 0), message_id)
+    for (conversation_id, user_id), last_read in watermarks.items():
+        conn.execute(
+            sa.text(
+                "UPDATE conversation_participant SET last_read_message_id = :last_read "
+                "WHERE conversation_id = :conversation_id AND user_id = :user_id"
+            ),
+            {"last_read": last_read, "conversation_id": conversation_id, "user_id": user_id},
+        )
+
+    op.create_index('ix_messages_conversation_id_id', 'messages', ['conversation_id', 'id'], unique=False)
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_column('read_by')
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('read_by', sa.JSON(), nullable=True))
+
+    # watermark 이하 메시지는 모두 읽은 것으로 펼쳐서 복원
+    conn = op.get_bind()
+    watermarks = {}
+    for conversation_id, user_id, last_read in conn.execute(sa.text(
+        "SELECT conversation_id, user_id, last_read_message_id FROM conversation_participant "
+        "WHERE last_read_message_id IS NOT NULL"
+    )).fetchall():
+        watermarks.setdefault(conversation_id, []).append((user_id, last_read))
+    for message_id, conversation_id in conn.execute(sa.text("SELECT id, conversation_id FROM messages")).fetchall():
+        read_by = sorted(u for u, last_read in watermarks.get(conversation_id, []) if last_read >= message_id)
+        conn.execute(
+            sa.text("UPDATE messages SET read_by = :read_by WHERE id = :id"),
+            {"read_by": json.dumps(read_by), "id": message_id},
+        )
+
+    op.drop_index('ix_messages_conversation_id_id', table_name='messages')
+    with op.batch_alter_table('conversation_participant', schema=None) as batch_op:
+        batch_op.drop_column('last_read_message_id')
@@ -40,3 +40,14 @@ def get_current_user(
     db.refresh(user) # Refresh the user object to ensure relationships are loaded
     return user
 
+
+
+def get_current_active_superuser(
+    current_user: models.user.User = Depends(get_current_user),
+) -> models.user.User:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The user doesn't have enough privileges",
+        )
+    return current_user
@@ -1,6 +1,6 @@
-from typing import List, Any
+from typing import List, Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app import crud, schemas
@@ -58,6 +58,35 @@ def read_messages_in_conversation(
     messages = crud.message.get_messages_in_conversation(db, conversation_id=conversation_id, skip=skip, limit=limit)
     return messages
 
+@router.get("/conversations/{conversation_id}/messages/page", response_model=schemas.MessagePage)
+def read_messages_page(
+    conversation_id: int,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Cursor-paginated messages, newest first.
+    Pass before_id to scroll back to older messages, or after_id to fetch messages newer than one you have;
+    next_cursor continues in the same direction.
+    """
+    if before_id is not None and after_id is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either before_id or after_id, not both.")
+
+    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+    if not conversation or current_user not in conversation.participants:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this conversation.")
+
+    messages, has_more = crud.message.get_messages_page(
+        db, conversation_id=conversation_id, limit=limit, before_id=before_id, after_id=after_id
+    )
+    next_cursor = None
+    if has_more and messages:
+        next_cursor = messages[0].id if after_id is not None else messages[-1].id
+    return {"messages": messages, "has_more": has_more, "next_cursor": next_cursor}
+
 @router.post("/conversations/{conversation_id}/messages", response_model=schemas.MessageRead, status_code=status.HTTP_201_CREATED)
 async def send_message( # Make it async
     conversation_id: int,
@@ -83,6 +112,30 @@ async def send_message( # Make it async
 
     return message
 
+@router.post("/conversations/{conversation_id}/read", response_model=schemas.ReadReceipt)
+async def mark_conversation_as_read(
+    conversation_id: int,
+    read_in: schemas.ConversationMarkRead,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Mark every message in a conversation up to read_in.up_to_message_id (default: the latest) as read.
+    Other participants get a single read-receipt event over WebSocket when the read position moves.
+    """
+    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+    if not conversation or current_user not in conversation.participants:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this conversation.")
+
+    last_read, moved = crud.message.mark_conversation_read(
+        db, conversation_id=conversation_id, user_id=current_user.id, up_to_message_id=read_in.up_to_message_id
+    )
+    receipt = schemas.ReadReceipt(conversation_id=conversation_id, user_id=current_user.id, last_read_message_id=last_read)
+    if moved:
+        other_ids = [p.id for p in conversation.participants if p.id != current_user.id]
+        await manager.broadcast(receipt.model_dump_json(), other_ids)
+    return receipt
+
 @router.post("/messages/{message_id}/read", response_model=schemas.MessageRead)
 def mark_message_as_read(
     message_id: int,
@@ -1,98 +1,329 @@
 # app/api/v1/endpoints/recommend.py
-from typing import Any, List
+import json
+from typing import Any, List, Optional, Tuple
 
-import pandas as pd
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app import crud, schemas
 from app.api import deps
+from app.db.session import SessionLocal
+from app.models.team import TeamMemberStatus
 from app.models.user import User
-from app.recsys.matcher import UserMatcher, MatchConfig
+from app.recsys.cache import recommendation_cache
+from app.recsys.composition import complement_team
+from app.recsys.display import user_display_cache
+from app.recsys.index import matcher_index
+from app.recsys.matcher import UserMatcher, UserNotIndexedError
 from app.schemas.user import UserWithSimilarity  # 추가
 
 router = APIRouter()
 
 
+def _filter_mask(
+    db: Session,
+    matcher: UserMatcher,
+    current_user: User,
+    contest_id: Optional[int],
+    major: Optional[str],
+    exclude_teammates: bool,
+) -> Optional[np.ndarray]:
+    """추천 필터 쿼리 파라미터 -> 매처 행 순서의 bool mask (필터가 없으면 None)."""
+    mask = None
+    if contest_id is not None:
+        mask = matcher.mask_for_ids(crud.team.get_contest_participant_ids(db, contest_id=contest_id))
+    if major:
+        m = matcher.major_mask(major)
+        mask = m if mask is None else mask & m
+    if exclude_teammates:
+        m = ~matcher.mask_for_ids(crud.team.get_teammate_ids(db, user_id=current_user.id))
+        mask = m if mask is None else mask & m
+    return mask
+
+
+def _rank_users(
+    db: Session,
+    current_user: User,
+    topk: int,
+    contest_id: Optional[int] = None,
+    major: Optional[str] = None,
+    exclude_teammates: bool = False,
+) -> List[Tuple[int, float]]:
+    """
+    현재 유저 기준 추천 순위 [(user_id, similarity), ...] 계산 (표시 정보는 채우지 않음).
+    캐시 -> 미리 계산된 결과 -> 인덱스 순서로 시도.
+    필터(contest_id / major / exclude_teammates)가 있으면 인덱스에서 mask를 적용해 바로 계산
+    (팀/공모전 참가 변경은 인덱스 version에 안 잡혀서 캐시하지 않음).
+    """
+    # 유저별로 학습된 가중치가 있으면 조회 시점에 적용
+    personal = crud.recommendation.get_match_weights(db, user_id=current_user.id)
+    filtered = contest_id is not None or bool(major) or exclude_teammates
+
+    # 0) 같은 인덱스 version에서 이미 계산한 순위가 있으면 재사용 (유저 정보는 항상 DB에서 새로 읽음)
+    cache_key = (current_user.id, topk, personal.updated_at if personal else None)
+    generation = matcher_index.version
+    ranked = None if filtered else recommendation_cache.get(cache_key, generation)
+    if ranked is not None:
+        return ranked
+
+    # 1) 백그라운드 잡이 미리 계산해 둔 결과가 있고, 그 이후 프로필/가중치가 안 바뀌었으면 그대로 사용
+    precomputed = [] if filtered else crud.recommendation.get_user_recommendations(db, user_id=current_user.id, limit=topk)
+    if len(precomputed) == topk:
+        computed_at = precomputed[0][2]
+        changed_at = [current_user.profile_updated_at, personal.updated_at if personal else None]
+        if all(t is None or t <= computed_at for t in changed_at):
+            ranked = [(other_id, similarity) for other_id, similarity, _ in precomputed]
+            recommendation_cache.put(cache_key, ranked, generation)
+            return ranked
+
+    # 2) 없거나 stale이면 서버 시작 때 만들어 둔 인덱스로 바로 계산 (캐시는 이 매처의 version 기준)
+    matcher, generation = matcher_index.snapshot(db)
+    if matcher is None:
+        return []
+
+    # 인덱스 build 이후 가입했는데 아직 반영이 안 된 경우 바로 추가 (갱신된 매처를 다시 받음)
+    if current_user.id not in matcher.idx_by_id:
+        matcher_index.upsert_user(current_user)
+        matcher, generation = matcher_index.snapshot(db)
+
+    try:
+        # 3) 현재 유저 기준 top-k 추천 (여기에 similarity 포함됨)
+        ids, sims = matcher.topk_ids(
+            current_user.id,
+            topk=topk,
+            candidate_ids=matcher_index.candidates_for(current_user.id),
+            weights=personal.as_tuple() if personal else None,
+            mask=_filter_mask(db, matcher, current_user, contest_id, major, exclude_teammates) if filtered else None,
+        )
+    except UserNotIndexedError as e:
+        # current_user가 인덱스에 없을 때만 404 (그 밖의 오류는 그대로 500)
+        raise HTTPException(status_code=404, detail=str(e))
+    print(f"[DEBUG] Recommended user info length: {len(ids)}")
+
+    ranked = list(zip(ids.tolist(), sims.tolist()))
+    if not filtered:
+        recommendation_cache.put(cache_key, ranked, generation)
+    return ranked
+
+
+def _explain_source(
+    db: Session, current_user: User
+) -> Tuple[Optional[UserMatcher], Optional[Tuple[float, float, float]]]:
+    """
+    breakdown 계산에 쓸 매처와 유저별 가중치를 한 번에 읽음.
+    스트림은 모든 페이지에 같은 값을 넘겨서, 도중에 인덱스가 바뀌어도 같은 기준으로 설명함.
+    """
+    personal = crud.recommendation.get_match_weights(db, user_id=current_user.id)
+    return matcher_index.get(db), personal.as_tuple() if personal else None
+
+
+def _attach_breakdown(
+    matcher: Optional[UserMatcher],
+    user_id: int,
+    weights: Optional[Tuple[float, float, float]],
+    rows: List[dict],
+) -> List[dict]:
+    """hydrate된 추천 행들에 필드별 점수 / 공유 토큰 설명(breakdown)을 한 번에 계산해서 붙임."""
+    if matcher is None or not rows:
+        return rows
+    breakdowns = matcher.explain(user_id, [row["id"] for row in rows], weights=weights)
+    for row, breakdown in zip(rows, breakdowns):
+        row["breakdown"] = breakdown
+    return rows
+
+
 @router.get("/", response_model=List[UserWithSimilarity])
 def recommend_users(
     topk: int = Query(5, ge=1, le=50, description="반환할 추천 유저 수"),
+    contest_id: Optional[int] = Query(None, description="이 공모전에 참가 중인 팀의 멤버만"),
+    major: Optional[str] = Query(None, description="이 전공인 유저만"),
+    exclude_teammates: bool = Query(False, description="이미 같은 팀인 유저 제외"),
+    explain: bool = Query(False, description="전공/스킬/관심사별 점수와 공유 토큰 포함"),
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     현재 로그인한 유저 기준으로 추천 유저 + similarity 점수 반환.
+    contest_id / major / exclude_teammates로 후보를 거른 뒤 top-k를 고름.
+    explain=true면 결과마다 breakdown(필드별 코사인, 공유 토큰)을 채움.
+    """
+    ranked = _rank_users(db, current_user, topk, contest_id, major, exclude_teammates)
+
+    # 4) 추천된 유저들의 표시 정보만 캐시(없으면 DB)에서 채워서 top-k 순서대로 반환
+    result = user_display_cache.hydrate(db, ranked)
+    if explain:
+        matcher, weights = _explain_source(db, current_user)
+        _attach_breakdown(matcher, current_user.id, weights, result)
+    print(f"[DEBUG] Returning {len(result)} users with similarity")
+    return result
+
+
+@router.get("/stream")
+def recommend_users_stream(
+    topk: int = Query(200, ge=1, le=500, description="반환할 추천 유저 수"),
+    page_size: int = Query(20, ge=1, le=100, description="한 번에 보내는 유저 수"),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$", description="ndjson 또는 sse"),
+    contest_id: Optional[int] = Query(None, description="이 공모전에 참가 중인 팀의 멤버만"),
+    major: Optional[str] = Query(None, description="이 전공인 유저만"),
+    exclude_teammates: bool = Query(False, description="이미 같은 팀인 유저 제외"),
+    explain: bool = Query(False, description="전공/스킬/관심사별 점수와 공유 토큰 포함"),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    탐색 페이지용 대량 추천. 순위는 한 번에 계산하고, 유저 정보는 page_size명씩 채우는 대로 바로 전송.
+    - ndjson: 한 줄에 UserWithSimilarity 하나 (application/x-ndjson)
+    - sse: 페이지마다 `event: page` (data = 유저 목록 JSON 배열), 마지막에 `event: end` (text/event-stream)
+    """
+    ranked = _rank_users(db, current_user, topk, contest_id, major, exclude_teammates)
+    # 모든 페이지의 breakdown을 같은 매처 / 가중치로 계산하도록 여기서 한 번만 읽음
+    matcher, weights = _explain_source(db, current_user) if explain else (None, None)
+    user_id = current_user.id
+
+    def pages():
+        # 응답을 보내는 동안 요청 세션이 먼저 닫힐 수 있어서 별도 세션 사용
+        stream_db = SessionLocal()
+        sent = 0
+        try:
+            for start in range(0, len(ranked), page_size):
+                rows = user_display_cache.hydrate(stream_db, ranked[start:start + page_size])
+                if explain:
+                    _attach_breakdown(matcher, user_id, weights, rows)
+                users = [UserWithSimilarity.model_validate(row).model_dump_json() for row in rows]
+                sent += len(users)
+                if format == "sse":
+                    yield f"event: page\ndata: [{','.join(users)}]\n\n"
+                else:
+                    yield "".join(f"{u}\n" for u in users)
+            if format == "sse":
+                yield f"event: end\ndata: {json.dumps({'count': sent})}\n\n"
+        finally:
+            stream_db.close()
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(pages(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/positions", response_model=List[schemas.RecommendedPosition])
+def recommend_positions(
+    topk: int = Query(10, ge=1, le=50, description="반환할 추천 포지션 수"),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    현재 로그인한 유저에게 맞는 모집 중인 팀의 오픈 포지션 + similarity 점수 반환.
+    이미 멤버이거나 지원한 팀은 제외.
+    """
+    matcher = matcher_index.get(db)
+    if matcher is None:
+        return []
+    if current_user.id not in matcher.idx_by_id:
+        matcher_index.upsert_user(current_user)
+
+    ranked = matcher_index.recommend_positions(
+        current_user.id,
+        topk=topk,
+        exclude_team_ids=set(crud.team.get_team_ids_by_user(db, user_id=current_user.id)),
+    )
+    positions = {p.id: p for p in crud.team.get_open_positions_by_ids(db, ids=[r["position_id"] for r in ranked])}
+
+    result: List[schemas.RecommendedPosition] = []
+    for r in ranked:
+        p = positions.get(r["position_id"])
+        if p is None:
+            continue
+        result.append(schemas.RecommendedPosition(
+            id=p.id,
+            team_id=p.team_id,
+            role_name=p.role_name,
+            required_skills=p.required_skills,
+            required_count=p.required_count,
+            filled_count=p.filled_count,
+            team_name=p.team.name,
+            team_description=p.team.description,
+            contest_id=p.team.contest_id,
+            similarity=r["similarity"],
+        ))
+    return result
+
+
+@router.get("/teams/{team_id}/members", response_model=List[schemas.ComplementaryMember])
+def recommend_team_members(
+    team_id: int,
+    topk: Optional[int] = Query(None, ge=1, le=50, description="추천 인원 수 (기본: 남은 자리 수)"),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
     """
-    # 1) DB에서 전체 유저 로드
-    users = crud.user.get_multi(db, limit=None)
-    print(f"[DEBUG] Total users fetched: {len(users)}")
-    print(f"[DEBUG] Current user ID: {current_user.id}")
+    팀 리더용: 현재 멤버에게 없는, 오픈 포지션이 요구하는 스킬을 가장 많이 채워주는 유저를
+    남은 자리 수만큼 greedy로 골라서 반환 (나와 비슷한 유저가 아니라 팀을 보완하는 유저).
+    """
+    team = crud.team.get_team(db, team_id=team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    if team.leader_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    if not users:
+    matcher = matcher_index.get(db)
+    if matcher is None:
         return []
 
-    # 2) SQLAlchemy User -> DataFrame 변환
-    user_data = [
-        {
-            "user_id": user.id,
-            "name": user.full_name,
-            "major": (user.major or ""),
-            "skills": ";".join([skill.name for skill in user.skills]),
-            "interests": ";".join([interest.name for interest in user.interests]),
-        }
-        for user in users
-    ]
-    users_df = pd.DataFrame(user_data)
-    print(f"[DEBUG] Users DataFrame head:\n{users_df.head()}")
+    accepted_ids = [m.user_id for m in team.members if m.status == TeamMemberStatus.ACCEPTED]
+    slots = team.member_limit - len(accepted_ids)
+    if topk is not None:
+        slots = min(slots, topk)
 
-    # 3) 매처 구성
-    cfg = MatchConfig.from_values(topk=topk)
-    matcher = UserMatcher(users_df, cfg)
+    # 오픈 포지션이 없으면 팀 설명으로 대신
+    needs = [f"{p.role_name};{p.required_skills or ''}" for p in team.open_positions if p.filled_count < p.required_count]
+    if not needs and team.description:
+        needs = [team.description.replace(" ", ";")]
 
-    try:
-        # 4) 현재 유저 기준 top-k 추천 (여기에 similarity 포함됨)
-        recommended_user_info = matcher.topk_for(current_user.id, topk=topk)
-        print(f"[DEBUG] Recommended user info length: {len(recommended_user_info)}")
-
-        # user_id -> similarity 매핑
-        sim_map = {item["user_id"]: item["similarity"] for item in recommended_user_info}
-        recommended_ids_in_order = [item["user_id"] for item in recommended_user_info]
-
-        # 5) DB에서 실제 User 객체 로드
-        #    (get_multi_by_ids가 정렬을 유지 안 할 수도 있으니 dict로 받자)
-        recommended_users = crud.user.get_multi_by_ids(db, ids=recommended_ids_in_order)
-        user_dict = {u.id: u for u in recommended_users}
-
-        # 6) top-k 순서를 유지하면서 UserWithSimilarity 리스트 구성
-        result: List[UserWithSimilarity] = []
-        for uid in recommended_ids_in_order:
-            u = user_dict.get(uid)
-            if u is None:
-                continue  # 혹시 DB에 없으면 스킵
-
-            sim = sim_map.get(uid, 0.0)
-
-            result.append(
-                UserWithSimilarity(
-                    id=u.id,
-                    email=u.email,
-                    full_name=u.full_name,
-                    major=u.major,
-                    age=u.age,
-                    phone_number=u.phone_number,
-                    introduction=u.introduction,
-                    profile_image_url=u.profile_image_url,
-                    phone_number_public=u.phone_number_public,
-                    age_public=u.age_public,
-                    skills=list(u.skills),         # Pydantic이 Skill 모델로 변환해줌
-                    interests=list(u.interests),   # Pydantic이 Interest 모델로 변환해줌
-                    similarity=sim,
-                )
-            )
-
-        print(f"[DEBUG] Returning {len(result)} users with similarity")
-        return result
-
-    except ValueError as e:
-        # current_user가 users_df에 없을 때 등
-        raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
+    picks = complement_team(
+        matcher,
+        member_ids=accepted_ids,
+        needs=needs,
+        slots=slots,
+        exclude_ids=[m.user_id for m in team.members] + [team.leader_id],
+    )
+    rows = user_display_cache.hydrate(db, [(p["user_id"], p["gain"]) for p in picks])
+    covers = {p["user_id"]: p["covers"] for p in picks}
+    return [{**row, "covers": covers[row["id"]]} for row in rows]
+
+
+@router.get("/cache/stats", response_model=schemas.RecommendationCacheStats)
+def recommendation_cache_stats(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    추천 결과 캐시 hit/miss 통계 (모니터링용, 관리자 전용).
+    """
+    return recommendation_cache.stats()
+
+
+@router.post("/batch", response_model=List[schemas.BatchRecommendation])
+def recommend_users_batch(
+    batch_in: schemas.BatchRecommendRequest,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    여러 유저의 추천 결과를 한 번에 계산 (관리자용, 추천 다이제스트 배치).
+    user_ids를 비우면 인덱스에 있는 전체 유저 대상.
+    """
+    matcher = matcher_index.get(db)
+    if matcher is None:
+        return []
+
+    user_ids = batch_in.user_ids
+    # /recommend, 미리 계산된 결과와 같도록 유저별로 학습된 가중치 적용
+    weights = crud.recommendation.get_all_match_weights(db, user_ids=user_ids)
+    if user_ids is None:
+        user_ids = list(matcher.idx_by_id.keys())
+
+    recommendations = matcher.topk_for_many(user_ids, topk=batch_in.topk, weights=weights)
+    return [
+        schemas.BatchRecommendation(user_id=uid, matches=matches)
+        for uid, matches in recommendations.items()
+    ]
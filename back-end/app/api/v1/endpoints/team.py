@@ -197,6 +197,12 @@ def respond_to_invitation(
         # Create team member
         team_member_in = schemas.TeamMemberCreate(user_id=current_user.id, team_id=invitation.team_id)
         team_member = crud.team.create_team_member(db, team_member_in=team_member_in, status=TeamMemberStatus.ACCEPTED)
+
+        # The interaction is committed together with the invitation status change
+        crud.recommendation.log_interaction(
+            db, user_id=current_user.id, other_id=team.leader_id, accepted=True,
+            source="invitation", team_id=team.id,
+        )
         crud.team.update_invitation_status(db, invitation, InvitationStatus.ACCEPTED)
 
         # Send message to leader
@@ -207,6 +213,11 @@ def respond_to_invitation(
 
         return team_member
     else:
+        # The interaction is committed together with the invitation status change
+        crud.recommendation.log_interaction(
+            db, user_id=current_user.id, other_id=team.leader_id, accepted=False,
+            source="invitation", team_id=team.id,
+        )
         crud.team.update_invitation_status(db, invitation, InvitationStatus.REJECTED)
 
         raise HTTPException(status_code=200, detail="Invitation rejected") # Return 200 for rejection
@@ -251,7 +262,14 @@ def respond_to_application(
         # Check if team is full
         if len(team.members) >= team.member_limit:
             raise HTTPException(status_code=400, detail="Team is full")
-        
+
+    # The interaction is committed together with the member status change below
+    crud.recommendation.log_interaction(
+        db, user_id=current_user.id, other_id=team_member.user_id, accepted=accept,
+        source="application", team_id=team.id,
+    )
+
+    if accept:
         updated_team_member = crud.team.update_team_member_status(db, team_member, TeamMemberStatus.ACCEPTED)
         return updated_team_member
     else:
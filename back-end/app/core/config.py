@@ -27,6 +27,23 @@ class Settings(BaseSettings):
 
     UPLOAD_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads")
 
+    # Recommendation index
+    RECSYS_REFIT_INTERVAL_SECONDS: int = 3600 # full TF-IDF refit period, 0 disables the background refit
+    RECSYS_REFIT_MAX_UPDATES: int = 200 # refit early once this many incremental updates pile up
+    RECSYS_PRECOMPUTE_TOPK: int = 50 # neighbours stored per user in user_recommendations
+    RECSYS_PRECOMPUTE_CHUNK_SIZE: int = 512
+    RECSYS_PRECOMPUTE_IN_PROCESS: bool = True # refresh user_recommendations from the API server's background thread; set False when running `python -m app.recsys.precompute` separately
+    RECSYS_POSTING_CANDIDATES: bool = False # score only users sharing a skill/interest; off since the full scan is faster on our data (recsys-test/bench_postings.py)
+    RECSYS_POSTING_MAX_FRACTION: float = 0.02 # skip the candidate stage when it would keep more than this share of users
+    RECSYS_ANN: str | None = None # "lsh" to score only LSH candidates instead of every user
+    RECSYS_FEATURES: str = "tfidf" # "hashed": fixed hashed feature space, updates never need a full refit
+    RECSYS_BUILD_WORKERS: int = 1 # processes for sharded index builds (only used for large user counts)
+    RECSYS_TRAIN_BATCH_SIZE: int = 5000 # match_interactions rows consumed per trainer batch
+    RECSYS_TRAIN_MIN_EVENTS: int = 2 # accept+reject events needed before a user gets personal weights
+    RECSYS_CACHE_SIZE: int = 1024 # cached /recommend results (LRU), 0 disables the cache
+    RECSYS_CACHE_TTL_SECONDS: int = 300
+    RECSYS_DISPLAY_CACHE_TTL_SECONDS: int = 300 # cached user display fields used to hydrate recommendations
+
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
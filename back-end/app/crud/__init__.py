@@ -3,3 +3,4 @@ from .crud_message import crud_message as message
 from . import crud_team as team
 from . import crud_notification as notification
 from . import crud_contest as contest
+from . import crud_recommendation as recommendation
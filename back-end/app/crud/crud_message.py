@@ -1,6 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, selectinload
 
 from app.models.message import Conversation, Message, ConversationType, conversation_participant_association
 from app.models.user import User
@@ -12,13 +14,12 @@ class CRUDMessage:
         if len(user_ids) != 2:
             return None 
 
-        dm_conversations = db.query(Conversation).filter(Conversation.type == ConversationType.DM).all()
-
-        for conv in dm_conversations:
-            participant_ids_in_conv = sorted([p.id for p in conv.participants])
-            if participant_ids_in_conv == sorted(user_ids):
-                return conv
-        return None
+        # (작은 id, 큰 id) unique index로 한 번에 조회
+        low_id, high_id = sorted(user_ids)
+        return db.query(Conversation).filter(
+            Conversation.dm_user_low_id == low_id,
+            Conversation.dm_user_high_id == high_id,
+        ).first()
 
     def create_conversation(self, db: Session, conversation_in: ConversationCreate, current_user_id: int) -> Conversation:
         print(f"[DEBUG] create_conversation called with: participant_ids={conversation_in.participant_ids}, type={conversation_in.type}, current_user_id={current_user_id}")
@@ -41,9 +42,15 @@ class CRUDMessage:
                 raise ValueError("Current user must be a participant in the DM.")
 
             # 생성
-            db_conversation = Conversation(type=conversation_in.type)
+            low_id, high_id = sorted(conversation_in.participant_ids)
+            db_conversation = Conversation(type=conversation_in.type, dm_user_low_id=low_id, dm_user_high_id=high_id)
             db.add(db_conversation)
-            db.flush() # Flush to get conversation ID
+            try:
+                db.flush() # Flush to get conversation ID
+            except IntegrityError:
+                # 같은 두 사람의 DM이 동시에 만들어진 경우 먼저 만들어진 쪽을 사용
+                db.rollback()
+                return self.get_conversation_by_participants(db, conversation_in.participant_ids)
 
             # 추가 
             for user_id in conversation_in.participant_ids:
@@ -77,21 +84,64 @@ class CRUDMessage:
             raise ValueError("Invalid conversation type.")
 
     def get_user_conversations(self, db: Session, user_id: int) -> List[dict]:
-        conversations = db.query(Conversation).join(Conversation.participants).filter(User.id == user_id).all()
+        """
+        Inbox rows for user_id: every conversation with its participants, latest message and unread count.
 
-        result = []
-        for conv in conversations:
-            # 최신 메시지 가져오기 
-            latest_message = db.query(Message).filter(Message.conversation_id == conv.id).order_by(Message.created_at.desc()).first()
+        Query count does not grow with the number of conversations:
+        one statement for conversations + latest message + unread count, and selectinload
+        for participants and the latest message's sender.
+        """
+        my_conversations = (
+            select(conversation_participant_association.c.conversation_id)
+            .where(conversation_participant_association.c.user_id == user_id)
+        )
+
+        # 대화방별 최신 메시지 (created_at, id 내림차순 1등)
+        ranked = (
+            select(
+                Message.id.label("message_id"),
+                Message.conversation_id,
+                func.row_number().over(
+                    partition_by=Message.conversation_id,
+                    order_by=(Message.created_at.desc(), Message.id.desc()),
+                ).label("rn"),
+            )
+            .where(Message.conversation_id.in_(my_conversations))
+            .subquery()
+        )
 
-            # Calculate unread count ( sent / read 여부 기준 )
-            unread_count = db.query(Message).filter(
-                Message.conversation_id == conv.id,
+        # 대화방별 안 읽은 메시지 수 ( sent / read 여부 기준 )
+        # 마지막으로 읽은 메시지 id 이후 범위만 세므로 (conversation_id, id) index range scan
+        cp = conversation_participant_association.c
+        unread = (
+            select(Message.conversation_id, func.count(Message.id).label("unread_count"))
+            .join(
+                conversation_participant_association,
+                and_(cp.conversation_id == Message.conversation_id, cp.user_id == user_id),
+            )
+            .where(
                 Message.sender_id != user_id, # Exclude messages sent by current user
-                ~Message.read_by.contains(user_id) # Check if user_id is NOT in the read_by JSON array
-            ).count()
+                Message.id > func.coalesce(cp.last_read_message_id, 0),
+            )
+            .group_by(Message.conversation_id)
+            .subquery()
+        )
+
+        latest = aliased(Message)
+        rows = (
+            db.query(Conversation, latest, func.coalesce(unread.c.unread_count, 0))
+            .filter(Conversation.id.in_(my_conversations))
+            .outerjoin(ranked, and_(ranked.c.conversation_id == Conversation.id, ranked.c.rn == 1))
+            .outerjoin(latest, latest.id == ranked.c.message_id)
+            .outerjoin(unread, unread.c.conversation_id == Conversation.id)
+            .options(selectinload(Conversation.participants), selectinload(latest.sender))
+            .order_by(Conversation.id)
+            .all()
+        )
 
-            conv_data = {
+        self._attach_read_by(db, [latest_message for _, latest_message, _ in rows if latest_message is not None])
+        return [
+            {
                 "id": conv.id,
                 "type": conv.type,
                 "created_at": conv.created_at,
@@ -99,11 +149,63 @@ class CRUDMessage:
                 "latest_message": latest_message, # Pydantic
                 "unread_count": unread_count,
             }
-            result.append(conv_data)
-        return result
+            for conv, latest_message, unread_count in rows
+        ]
 
     def get_messages_in_conversation(self, db: Session, conversation_id: int, skip: int = 0, limit: int = 100) -> List[Message]:
-        return db.query(Message).filter(Message.conversation_id == conversation_id).order_by(Message.created_at).offset(skip).limit(limit).all() # type: ignore
+        messages = db.query(Message).filter(Message.conversation_id == conversation_id).order_by(Message.created_at).offset(skip).limit(limit).all() # type: ignore
+        return self._attach_read_by(db, messages)
+
+    def get_messages_page(
+        self,
+        db: Session,
+        conversation_id: int,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> Tuple[List[Message], bool]:
+        """
+        Keyset page of a conversation's messages, newest first.
+        - before_id: messages older than before_id (no cursor = the latest page)
+        - after_id: messages newer than after_id, the ones right after the cursor
+        Each page is one range scan on the (conversation_id, id) index, so the cost does not
+        depend on how far back the page is. Returns (messages, whether more exist in that direction).
+        """
+        query = db.query(Message).options(selectinload(Message.sender)).filter(Message.conversation_id == conversation_id)
+        if after_id is not None:
+            query = query.filter(Message.id > after_id).order_by(Message.id.asc())
+        else:
+            if before_id is not None:
+                query = query.filter(Message.id < before_id)
+            query = query.order_by(Message.id.desc())
+
+        messages = query.limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if after_id is not None:
+            messages.reverse()
+        return self._attach_read_by(db, messages), has_more
+
+    def _attach_read_by(self, db: Session, messages: List[Message]) -> List[Message]:
+        """
+        Fill message.read_by from the participants' read watermarks
+        (one query for all conversations involved).
+        """
+        if not messages:
+            return messages
+        cp = conversation_participant_association.c
+        rows = db.execute(
+            select(cp.conversation_id, cp.user_id, cp.last_read_message_id).where(
+                cp.conversation_id.in_({m.conversation_id for m in messages}),
+                cp.last_read_message_id.is_not(None),
+            )
+        ).all()
+        watermarks: dict = {}
+        for conversation_id, user_id, last_read in rows:
+            watermarks.setdefault(conversation_id, []).append((user_id, last_read))
+        for m in messages:
+            m.read_by = sorted(u for u, last_read in watermarks.get(m.conversation_id, []) if last_read >= m.id)
+        return messages
 
     def create_message(self, db: Session, message_in: MessageCreate, sender_id: int) -> Message:
         db_message = Message(
@@ -119,12 +221,46 @@ class CRUDMessage:
         return db_message
 
     def mark_message_as_read(self, db: Session, message_id: int, user_id: int) -> Optional[Message]:
+        """
+        Move user_id's read watermark in the message's conversation up to message_id
+        (everything up to it counts as read). Never moves the watermark backwards.
+        """
         message = db.query(Message).filter(Message.id == message_id).first()
-        if message and user_id not in message.read_by:
-            message.read_by.append(user_id)
-            db.add(message)
-            db.commit()
-            db.refresh(message)
-        return message
+        if not message:
+            return None
+        self.mark_conversation_read(db, conversation_id=message.conversation_id, user_id=user_id, up_to_message_id=message_id)
+        return self._attach_read_by(db, [message])[0]
+
+    def mark_conversation_read(
+        self, db: Session, conversation_id: int, user_id: int, up_to_message_id: Optional[int] = None
+    ) -> Tuple[Optional[int], bool]:
+        """
+        Mark every message in the conversation up to up_to_message_id (default: the latest) as read
+        for user_id with a single UPDATE of the participant's read watermark.
+        The target is clamped to the last message of this conversation at or below up_to_message_id,
+        and the watermark never moves backwards.
+        Returns (watermark after the update, whether it moved).
+        """
+        cp = conversation_participant_association.c
+        target = select(func.max(Message.id)).where(Message.conversation_id == conversation_id)
+        if up_to_message_id is not None:
+            target = target.where(Message.id <= up_to_message_id)
+        target = target.scalar_subquery()
+
+        result = db.execute(
+            conversation_participant_association.update()
+            .where(
+                cp.conversation_id == conversation_id,
+                cp.user_id == user_id,
+                target.is_not(None),
+                or_(cp.last_read_message_id.is_(None), cp.last_read_message_id < target),
+            )
+            .values(last_read_message_id=target)
+        )
+        db.commit()
+        last_read = db.execute(
+            select(cp.last_read_message_id).where(cp.conversation_id == conversation_id, cp.user_id == user_id)
+        ).scalar()
+        return last_read, result.rowcount > 0
 
 crud_message = CRUDMessage()
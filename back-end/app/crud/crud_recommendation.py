@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.recommendation import (
+    MatchInteraction,
+    RecsysWatermark,
+    UserInteractionStats,
+    UserMatchWeights,
+    UserRecommendation,
+)
+
+
+def get_user_recommendations(db: Session, user_id: int, limit: int) -> List[Tuple[int, float, datetime]]:
+    """미리 계산된 추천을 rank 순으로 (other_id, similarity, computed_at) 튜플로 반환 (유저 정보는 조인하지 않음)."""
+    return (
+        db.query(UserRecommendation.other_id, UserRecommendation.similarity, UserRecommendation.computed_at)
+        .filter(UserRecommendation.user_id == user_id, UserRecommendation.rank < limit)
+        .order_by(UserRecommendation.rank)
+        .all()
+    )
+
+
+def replace_user_recommendations(
+    db: Session,
+    recommendations: Dict[int, Sequence[Dict]],
+    computed_at: datetime,
+) -> None:
+    """
+    recommendations: user_id -> [{"user_id": other_id, "similarity": ...}, ...] (rank 순)
+    해당 유저들의 기존 행을 지우고 새 결과로 교체.
+    """
+    if not recommendations:
+        return
+    db.query(UserRecommendation).filter(
+        UserRecommendation.user_id.in_(list(recommendations.keys()))
+    ).delete(synchronize_session=False)
+    db.bulk_insert_mappings(
+        UserRecommendation,
+        [
+            {
+                "user_id": user_id,
+                "rank": rank,
+                "other_id": match["user_id"],
+                "similarity": match["similarity"],
+                "computed_at": computed_at,
+            }
+            for user_id, matches in recommendations.items()
+            for rank, match in enumerate(matches)
+        ],
+    )
+    db.commit()
+
+
+def get_match_weights(db: Session, user_id: int) -> Optional[UserMatchWeights]:
+    return db.query(UserMatchWeights).filter(UserMatchWeights.user_id == user_id).first()
+
+
+def get_all_match_weights(
+    db: Session, user_ids: Optional[Sequence[int]] = None
+) -> Dict[int, Tuple[float, float, float]]:
+    """user_id -> (w_major, w_skills, w_interests), 배치 추천 계산용. user_ids를 주면 그 유저들만."""
+    query = db.query(
+        UserMatchWeights.user_id,
+        UserMatchWeights.w_major,
+        UserMatchWeights.w_skills,
+        UserMatchWeights.w_interests,
+    )
+    if user_ids is not None:
+        query = query.filter(UserMatchWeights.user_id.in_(list(user_ids)))
+    return {r[0]: (r[1], r[2], r[3]) for r in query.all()}
+
+
+def set_match_weights(db: Session, user_id: int, weights: Dict[str, float]) -> UserMatchWeights:
+    db_weights = get_match_weights(db, user_id)
+    if db_weights is None:
+        db_weights = UserMatchWeights(user_id=user_id)
+    db_weights.w_major = weights["w_major"]
+    db_weights.w_skills = weights["w_skills"]
+    db_weights.w_interests = weights["w_interests"]
+    db_weights.updated_at = datetime.utcnow()
+    db.add(db_weights)
+    db.commit()
+    db.refresh(db_weights)
+    return db_weights
+
+
+def log_interaction(
+    db: Session,
+    *,
+    user_id: int,
+    other_id: int,
+    accepted: bool,
+    source: str,
+    team_id: Optional[int] = None,
+) -> MatchInteraction:
+    """
+    user_id가 other_id를 수락/거절한 이벤트를 추가 (가중치 학습용).
+    commit 하지 않음: 호출하는 쪽의 멤버/상태 변경과 같은 트랜잭션으로 commit 되어야
+    실패하거나 재시도된 요청이 이벤트만 남기지 않음.
+    """
+    event = MatchInteraction(
+        user_id=user_id,
+        other_id=other_id,
+        label=1 if accepted else -1,
+        source=source,
+        team_id=team_id,
+    )
+    db.add(event)
+    return event
+
+
+def get_interactions_after(db: Session, last_id: int, limit: int) -> List[Tuple[int, int, int, int]]:
+    """id > last_id 인 이벤트를 id 순으로 (id, user_id, other_id, label) 튜플로 반환."""
+    return (
+        db.query(MatchInteraction.id, MatchInteraction.user_id, MatchInteraction.other_id, MatchInteraction.label)
+        .filter(MatchInteraction.id > last_id)
+        .order_by(MatchInteraction.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def get_watermark(db: Session, name: str) -> int:
+    row = db.query(RecsysWatermark).filter(RecsysWatermark.name == name).first()
+    return row.last_id if row else 0
+
+
+def set_watermark(db: Session, name: str, last_id: int) -> None:
+    """commit은 호출하는 쪽에서 (같은 트랜잭션의 통계 갱신과 함께)."""
+    row = db.query(RecsysWatermark).filter(RecsysWatermark.name == name).first()
+    if row is None:
+        row = RecsysWatermark(name=name)
+    row.last_id = last_id
+    db.add(row)
+
+
+def get_interaction_stats_many(db: Session, user_ids: Sequence[int]) -> Dict[int, UserInteractionStats]:
+    rows = db.query(UserInteractionStats).filter(UserInteractionStats.user_id.in_(list(user_ids))).all()
+    return {row.user_id: row for row in rows}
+
+
+def get_match_weights_many(db: Session, user_ids: Sequence[int]) -> Dict[int, UserMatchWeights]:
+    rows = db.query(UserMatchWeights).filter(UserMatchWeights.user_id.in_(list(user_ids))).all()
+    return {row.user_id: row for row in rows}
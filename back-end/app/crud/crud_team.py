@@ -3,7 +3,7 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 import secrets # For generating tokens
 
-from app.models.team import Team, TeamMember, TeamMemberRole, TeamMemberStatus, OpenPosition, Invitation, InvitationStatus
+from app.models.team import Team, TeamMember, TeamMemberRole, TeamMemberStatus, TeamStatus, OpenPosition, Invitation, InvitationStatus
 from app.models.notification import NotificationType
 from app.schemas.team import TeamCreate, TeamUpdate, OpenPositionCreate, TeamMemberCreate, InvitationCreate
 from app.schemas.notification import NotificationCreate
@@ -13,6 +13,7 @@ from app.crud.crud_message import crud_message # Import crud_message
 from app.schemas.message import MessageCreate, ConversationCreate # Import MessageCreate and ConversationCreate
 from app.models.message import ConversationType # Import ConversationType
 from app.models.user import User # Import User model
+from app.recsys.index import matcher_index
 import json # Import json
 
 def get_team(db: Session, team_id: int) -> Optional[Team]:
@@ -25,6 +26,38 @@ def get_team(db: Session, team_id: int) -> Optional[Team]:
 def get_teams_by_user(db: Session, user_id: int) -> List[Team]:
     return db.query(Team).options(joinedload(Team.contest)).join(TeamMember).filter(TeamMember.user_id == user_id).all()
 
+def get_team_ids_by_user(db: Session, user_id: int) -> List[int]:
+    # 지원 대기 / 거절 포함, 멤버십 행이 있는 모든 팀
+    return [r[0] for r in db.query(TeamMember.team_id).filter(TeamMember.user_id == user_id).all()]
+
+def get_teammate_ids(db: Session, user_id: int) -> List[int]:
+    # user_id가 수락된 멤버(리더 포함)인 팀들의 다른 수락된 멤버
+    my_teams = db.query(TeamMember.team_id).filter(
+        TeamMember.user_id == user_id, TeamMember.status == TeamMemberStatus.ACCEPTED
+    )
+    rows = (
+        db.query(TeamMember.user_id)
+        .filter(
+            TeamMember.team_id.in_(my_teams),
+            TeamMember.status == TeamMemberStatus.ACCEPTED,
+            TeamMember.user_id != user_id,
+        )
+        .distinct()
+        .all()
+    )
+    return [r[0] for r in rows]
+
+def get_contest_participant_ids(db: Session, contest_id: int) -> List[int]:
+    # 해당 공모전에 참가하는 팀들의 수락된 멤버(리더 포함)
+    rows = (
+        db.query(TeamMember.user_id)
+        .join(Team, Team.id == TeamMember.team_id)
+        .filter(Team.contest_id == contest_id, TeamMember.status == TeamMemberStatus.ACCEPTED)
+        .distinct()
+        .all()
+    )
+    return [r[0] for r in rows]
+
 def get_public_teams(db: Session, skip: int = 0, limit: int = 100) -> List[Team]:
     return db.query(Team).options(joinedload(Team.contest)).filter(Team.is_public == True).offset(skip).limit(limit).all()
 
@@ -81,6 +114,9 @@ def update_team(db: Session, team: Team, team_in: TeamUpdate) -> Team:
     db.add(team)
     db.commit()
     db.refresh(team)
+
+    # 모집 상태 / 공개 여부 / 설명이 바뀌면 포지션 추천 인덱스에 반영
+    matcher_index.upsert_team(team)
     return team
 
 def delete_team(db: Session, team_id: int) -> None:
@@ -89,6 +125,7 @@ def delete_team(db: Session, team_id: int) -> None:
     if db_team:
         db.delete(db_team)
         db.commit()
+        matcher_index.remove_team(team_id)
 
 def get_team_member(db: Session, team_id: int, user_id: int) -> Optional[TeamMember]:
     # 특정 멤버 가져오기 
@@ -173,14 +210,47 @@ def create_open_position(db: Session, open_position_in: OpenPositionCreate) -> O
     db.add(db_open_position)
     db.commit()
     db.refresh(db_open_position)
+
+    matcher_index.upsert_team(db_open_position.team)
     return db_open_position
 
+def get_open_positions_by_ids(db: Session, ids: List[int]) -> List[OpenPosition]:
+    return db.query(OpenPosition).options(joinedload(OpenPosition.team)).filter(OpenPosition.id.in_(ids)).all()
+
+def get_open_position_features(db: Session) -> List[dict]:
+    """
+    포지션 추천 인덱스 입력용 행을 한 번에 로드 (app.recsys.positions.position_rows와 같은 형식).
+    모집 중인 공개 팀의, 아직 자리가 남은 포지션만.
+    """
+    rows = (
+        db.query(OpenPosition.id, OpenPosition.team_id, OpenPosition.role_name, OpenPosition.required_skills, Team.description)
+        .join(Team, Team.id == OpenPosition.team_id)
+        .filter(
+            Team.status == TeamStatus.RECRUITING,
+            Team.is_public == True,
+            OpenPosition.filled_count < OpenPosition.required_count,
+        )
+        .order_by(OpenPosition.id)
+        .all()
+    )
+    return [
+        {
+            "position_id": r[0],
+            "team_id": r[1],
+            "role_name": r[2] or "",
+            "required_skills": r[3] or "",
+            "description": r[4] or "",
+        }
+        for r in rows
+    ]
+
 def increment_filled_count(db: Session, open_position: OpenPosition) -> OpenPosition:
     # filled_count 증가
     open_position.filled_count += 1
     db.add(open_position)
     db.commit()
     db.refresh(open_position)
+    matcher_index.upsert_team(open_position.team)
     return open_position
 
 def decrement_filled_count(db: Session, open_position: OpenPosition) -> OpenPosition:
@@ -190,6 +260,7 @@ def decrement_filled_count(db: Session, open_position: OpenPosition) -> OpenPosi
         db.add(open_position)
         db.commit()
         db.refresh(open_position)
+        matcher_index.upsert_team(open_position.team)
     return open_position
 
 def create_invitation(db: Session, team_id: int, email: str, expires_delta: int = 72) -> Invitation:
@@ -1,10 +1,15 @@
+from datetime import datetime
+
+from sqlalchemy import func
 from sqlalchemy.orm import Session, selectinload
 
 from app.core.security import get_password_hash, verify_password
-from app.models.user import User
+from app.models.user import User, user_skill_association, user_interest_association
 from app.models.skill import Skill
 from app.models.interest import Interest
 from app.schemas.user import UserCreate, UserBase, UserUpdate # Import UserBase for update
+from app.recsys.display import user_display_cache
+from app.recsys.index import matcher_index
 from typing import Any, Dict, Optional, Union, List
 
 
@@ -32,7 +37,8 @@ def create(db: Session, *, obj_in: UserCreate) -> User:
         full_name=obj_in.full_name,
         is_superuser=obj_in.is_superuser,
         major=obj_in.major,
-        profile_image_url=profile_image_to_use # Assign profile_image_url
+        profile_image_url=profile_image_to_use, # Assign profile_image_url
+        profile_updated_at=datetime.utcnow(),
     )
 
     if obj_in.skills:
@@ -54,6 +60,9 @@ def create(db: Session, *, obj_in: UserCreate) -> User:
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+
+    # 추천 인덱스에 새 유저 반영
+    matcher_index.upsert_user(db_obj)
     return db_obj
 
 def get_multi(db: Session, *, skip: int = 0, limit: Optional[int] = 100) -> List[User]:
@@ -63,7 +72,53 @@ def get_multi(db: Session, *, skip: int = 0, limit: Optional[int] = 100) -> List
     return query.all()
 
 def get_multi_by_ids(db: Session, *, ids: List[int]) -> List[User]:
-    return db.query(User).filter(User.id.in_(ids)).all()
+    return (
+        db.query(User)
+        .options(selectinload(User.skills), selectinload(User.interests))
+        .filter(User.id.in_(ids))
+        .all()
+    )
+
+def get_profile_features(db: Session, *, ids: Optional[List[int]] = None) -> Dict[str, List[Any]]:
+    """
+    추천 매처 입력용 프로필 피처를 컬럼 단위로 한 번에 로드.
+    스킬/관심사 이름은 유저별로 group_concat(';')해서 가져오므로 유저 수와 관계없이 쿼리 1번.
+    반환: {"user_id": [...], "name": [...], "major": [...], "skills": [...], "interests": [...]}
+    """
+    skills_sq = (
+        db.query(
+            user_skill_association.c.user_id.label("user_id"),
+            func.group_concat(Skill.name, ";").label("skills"),
+        )
+        .join(Skill, Skill.id == user_skill_association.c.skill_id)
+        .group_by(user_skill_association.c.user_id)
+        .subquery()
+    )
+    interests_sq = (
+        db.query(
+            user_interest_association.c.user_id.label("user_id"),
+            func.group_concat(Interest.name, ";").label("interests"),
+        )
+        .join(Interest, Interest.id == user_interest_association.c.interest_id)
+        .group_by(user_interest_association.c.user_id)
+        .subquery()
+    )
+    query = (
+        db.query(User.id, User.full_name, User.major, skills_sq.c.skills, interests_sq.c.interests)
+        .outerjoin(skills_sq, skills_sq.c.user_id == User.id)
+        .outerjoin(interests_sq, interests_sq.c.user_id == User.id)
+    )
+    if ids is not None:
+        query = query.filter(User.id.in_(ids))
+    rows = query.order_by(User.id).all()
+
+    return {
+        "user_id": [r[0] for r in rows],
+        "name": [r[1] or "" for r in rows],
+        "major": [r[2] or "" for r in rows],
+        "skills": [r[3] or "" for r in rows],
+        "interests": [r[4] or "" for r in rows],
+    }
 
 def update_user(
     db: Session,
@@ -75,6 +130,11 @@ def update_user(
     else:
         update_data = user_in.model_dump(exclude_unset=True) # Use model_dump for Pydantic v2
 
+    # 추천에 쓰이는 필드가 바뀌는지 (아래에서 skills/interests 키를 지우기 전에 확인)
+    profile_changed = any(key in update_data for key in ("major", "skills", "interests"))
+    if profile_changed:
+        db_user.profile_updated_at = datetime.utcnow()
+
     if "password" in update_data and update_data["password"]:
         hashed_password = get_password_hash(update_data["password"])
         del update_data["password"]
@@ -109,6 +169,11 @@ def update_user(
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+
+    # 추천 결과에 붙는 표시 정보는 어떤 필드가 바뀌든 다시 읽도록
+    user_display_cache.invalidate(db_user.id)
+    if profile_changed:
+        matcher_index.upsert_user(db_user)
     return db_user
 
 def search_users(db: Session, query: str) -> List[User]:
@@ -5,6 +5,9 @@ from fastapi.staticfiles import StaticFiles
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.db.base import create_tables
+from app.recsys.index import matcher_index
+from app.recsys.precompute import refresh_user_recommendations
+from app.recsys.training import train_from_interactions
 
 create_tables()
 
@@ -35,6 +38,23 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+def build_recommendation_index():
+    # 추천용 TF-IDF 인덱스는 서버 시작 때 한 번만 만들고 이후엔 증분 갱신
+    matcher_index.build()
+    # 백그라운드 스레드가 깨어날 때마다: 새 수락/거절 이벤트로 가중치 갱신 -> (인덱스가 바뀌었으면) 추천 테이블 다시 채움
+    # 추천 테이블은 API 프로세스 대신 `python -m app.recsys.precompute` (cron / 별도 워커)로 채울 수도 있음
+    matcher_index.add_job(train_from_interactions)
+    if settings.RECSYS_PRECOMPUTE_IN_PROCESS:
+        matcher_index.add_job(refresh_user_recommendations, only_on_change=True)
+    matcher_index.start()
+
+
+@app.on_event("shutdown")
+def stop_recommendation_index():
+    matcher_index.stop()
+
+
 @app.get("/")
 def read_root():
     return {"message": "Server is running"}
@@ -1,15 +1,16 @@
 import datetime
 import enum
+from typing import List
 
 from sqlalchemy import (
     Column,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
-    JSON,
 )
 from sqlalchemy.orm import relationship
 
@@ -24,6 +25,8 @@ conversation_participant_association = Table(
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
     Column("conversation_id", Integer, ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True),
+    # 이 참여자가 읽은 마지막 메시지 id (이 id 이하 메시지는 모두 읽은 것으로 봄, NULL = 안 읽음)
+    Column("last_read_message_id", Integer, nullable=True),
 )
 
 class Conversation(Base):
@@ -32,6 +35,13 @@ class Conversation(Base):
     id = Column(Integer, primary_key=True, index=True)
     type = Column(Enum(ConversationType), nullable=False)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # DM 대화방 조회 키: 두 참여자 id를 (작은 값, 큰 값) 순서로 저장 (팀 대화방은 NULL)
+    dm_user_low_id = Column(Integer, nullable=True)
+    dm_user_high_id = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_conversations_dm_pair", "dm_user_low_id", "dm_user_high_id", unique=True),
+    )
 
     participants = relationship(
         "User",
@@ -50,9 +60,22 @@ class Message(Base):
     conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
     file_url = Column(String, nullable=True)
     reply_to_message_id = Column(Integer, ForeignKey("messages.id"), nullable=True)
-    
-    # Using JSON to store a list of user_ids who have read the message
-    read_by = Column(JSON, default=[])
 
     sender = relationship("User")
     conversation = relationship("Conversation", back_populates="messages")
+
+    __table_args__ = (
+        # 대화방 안에서 id 범위 조회 (안 읽은 메시지 수)
+        Index("ix_messages_conversation_id_id", "conversation_id", "id"),
+    )
+
+    # List of user_ids who have read the message.
+    # Not stored per message: derived from conversation_participant.last_read_message_id
+    # (crud_message fills it in before returning messages)
+    @property
+    def read_by(self) -> List[int]:
+        return self.__dict__.get("_read_by", [])
+
+    @read_by.setter
+    def read_by(self, user_ids: List[int]) -> None:
+        self.__dict__["_read_by"] = user_ids
@@ -0,0 +1,70 @@
+import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+
+from app.db.base import Base
+
+
+class UserRecommendation(Base):
+    """백그라운드 잡이 미리 계산해 둔 유저별 top-k 추천 결과."""
+    __tablename__ = "user_recommendations"
+
+    # (user_id, rank) PK가 곧 추천 조회용 인덱스
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    other_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    similarity = Column(Float, nullable=False)
+    computed_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+
+class UserMatchWeights(Base):
+    """유저별로 학습된 (전공/스킬/관심사) 가중치. 추천 조회 시 U_* 행렬에 바로 적용."""
+    __tablename__ = "user_match_weights"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    w_major = Column(Float, nullable=False)
+    w_skills = Column(Float, nullable=False)
+    w_interests = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, nullable=False)
+
+    def as_tuple(self):
+        return (self.w_major, self.w_skills, self.w_interests)
+
+
+class MatchInteraction(Base):
+    """팀 지원/초대에 대한 수락(+1) / 거절(-1) 이벤트. append-only 로그."""
+    __tablename__ = "match_interactions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False) # 결정한 사람
+    other_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False) # 결정 대상
+    label = Column(Integer, nullable=False)
+    source = Column(String, nullable=False) # 'application', 'invitation'
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+
+class UserInteractionStats(Base):
+    """
+    유저별 수락/거절 상대와의 필드별 유사도 합과 건수.
+    트레이너가 새 이벤트만큼만 더해가며 user_match_weights를 다시 계산하는 데 씀.
+    """
+    __tablename__ = "user_interaction_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    pos_count = Column(Integer, default=0, nullable=False)
+    neg_count = Column(Integer, default=0, nullable=False)
+    pos_major = Column(Float, default=0.0, nullable=False)
+    pos_skills = Column(Float, default=0.0, nullable=False)
+    pos_interests = Column(Float, default=0.0, nullable=False)
+    neg_major = Column(Float, default=0.0, nullable=False)
+    neg_skills = Column(Float, default=0.0, nullable=False)
+    neg_interests = Column(Float, default=0.0, nullable=False)
+
+
+class RecsysWatermark(Base):
+    """배치 잡이 어디까지 처리했는지 (예: match_interactions의 마지막 id)."""
+    __tablename__ = "recsys_watermarks"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, default=0, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Table, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -31,6 +31,7 @@ class User(Base):
     introduction = Column(String, nullable=True) # Added missing column
     phone_number_public = Column(Boolean(), default=True) # Added missing column
     age_public = Column(Boolean(), default=True) # Added missing column
+    profile_updated_at = Column(DateTime, nullable=True) # last change to major/skills/interests (recommendation freshness)
 
     skills = relationship("Skill", secondary=user_skill_association, back_populates="users")
     interests = relationship("Interest", secondary=user_interest_association, back_populates="users")
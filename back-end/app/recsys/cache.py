@@ -0,0 +1,91 @@
+# app/recsys/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+
+class RecommendationCache:
+    """
+    프로세스 내 LRU + TTL 캐시 (추천 결과용).
+
+    - maxsize를 넘으면 가장 오래 안 쓴 항목부터 제거
+    - ttl_seconds가 지난 항목은 조회 시 miss 처리 (0 이하면 TTL 없음)
+    - generation(= MatcherIndex.version)이 올라가면 통째로 비움.
+      프로필 수정/회원가입으로 인덱스가 바뀌면 다른 유저의 추천 결과도 달라질 수 있어서
+      해당 유저 항목만 지우는 걸로는 부족함
+    - 현재보다 오래된 generation으로 들어온 get / put은 무시 (느린 요청이 예전 인덱스로 계산한 결과를
+      새 generation에 저장하거나, 캐시를 비우고 generation을 되돌리지 않도록)
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 300) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (저장 시각, 값)
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_generation(self, generation: int) -> bool:
+        """generation이 올라갔으면 비우고 갱신. generation이 현재 것이면 True."""
+        if self._generation is None or generation > self._generation:
+            if self._data:
+                self._data.clear()
+                self.invalidations += 1
+            self._generation = generation
+        return generation == self._generation
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key) if self._sync_generation(generation) else None
+            if entry is not None and self.ttl_seconds > 0 and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, generation: int) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if not self._sync_generation(generation):
+                return
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "generation": self._generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+recommendation_cache = RecommendationCache(
+    maxsize=settings.RECSYS_CACHE_SIZE,
+    ttl_seconds=settings.RECSYS_CACHE_TTL_SECONDS,
+)
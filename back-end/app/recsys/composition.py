@@ -0,0 +1,96 @@
+# app/recsys/composition.py
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.recsys.matcher import UserMatcher, _tok
+
+
+def complement_team(
+    matcher: UserMatcher,
+    member_ids: Iterable[int],
+    needs: Iterable[str],
+    slots: int,
+    exclude_ids: Optional[Iterable[int]] = None,
+) -> List[Dict]:
+    """
+    팀에 부족한 스킬을 가장 많이 채워주는 유저를 slots명까지 greedy로 선택.
+
+    needs: 팀이 원하는 스킬 텍스트들 (오픈 포지션의 역할명 / required_skills 등)
+    목표 함수 (가중 max-coverage, monotone submodular):
+        f(S) = Σ_t gap_t · max_{u∈S} has(u, t)
+      - t: needs에 나온 단어(unigram) 중 현재 멤버 누구도 스킬로 갖고 있지 않은 것
+      - gap_t: needs의 TF-IDF 가중치
+      - has(u, t): 유저 u의 스킬 필드에 단어 t가 있으면 1
+    greedy로 marginal gain이 가장 큰 유저를 하나씩 고르므로 (1 - 1/e) 근사 보장.
+    필요한 단어 열만 잘라낸 sparse 행렬과 잔여 gap 벡터의 곱 한 번이 한 스텝이라
+    후보 풀이 커도 slots번의 sparse mat-vec이면 끝남.
+
+    gain이 0이 되면 (더 채울 스킬이 없으면) slots보다 적게 반환할 수 있음.
+    반환: [{"user_id", "gain", "covers"}, ...] 선택 순서대로.
+      gain은 전체 gap 대비 그 유저가 새로 채운 비율, covers는 새로 채운 단어들.
+    """
+    if slots <= 0:
+        return []
+
+    need_doc = _tok(";".join(n for n in needs if n))
+    need_vec = matcher.vec.transform([need_doc])
+    # needs에 나온 단어(unigram)별 tf. 열 번호 / idf는 단어 하나짜리 문서를 transform해서 얻음
+    # (vocabulary 역조회가 없어서 tfidf / hashed 모드 모두 동작, 해시 충돌로 열이 겹치면 한 열로 합침)
+    tf = Counter(t for t in matcher.vec.build_analyzer()(need_doc) if " " not in t)
+    words = sorted(tf)
+    word_rows = matcher.vec.transform(words) if words else None
+    words_by_col: Dict[int, List[str]] = {}
+    for r, w in enumerate(words):
+        cols = word_rows.indices[word_rows.indptr[r]:word_rows.indptr[r + 1]]
+        if len(cols):  # vocabulary에 없는 단어는 건너뜀
+            words_by_col.setdefault(int(cols[0]), []).append(w)
+    if not words_by_col:
+        return []
+    need_cols = np.array(sorted(words_by_col), dtype=np.int64)
+    terms = [" / ".join(words_by_col[c]) for c in need_cols.tolist()]
+    # needs 문서에서 그 단어의 (l2 정규화 전) TF-IDF 가중치 = sublinear tf * idf
+    gap = np.array(
+        [sum(1.0 + np.log(tf[w]) for w in words_by_col[c]) for c in need_cols.tolist()]
+    ) * matcher.vec.idf_[need_cols].astype(np.float64)
+
+    # (전체 유저, 필요한 단어) 이진 행렬. 스킬 필드만 사용
+    A = matcher.U_skills[:, need_cols].tocsr()
+    A.data = np.ones_like(A.data)
+
+    member_rows = [matcher.idx_by_id[int(u)] for u in member_ids if int(u) in matcher.idx_by_id]
+    if member_rows:
+        covered = np.asarray(A[member_rows].max(axis=0).todense()).ravel() > 0
+        gap[covered] = 0.0
+    total = gap.sum()
+    if total <= 0:
+        return []
+
+    blocked = np.zeros(A.shape[0], dtype=bool)
+    blocked[member_rows] = True
+    for uid in exclude_ids or ():
+        i = matcher.idx_by_id.get(int(uid))
+        if i is not None:
+            blocked[i] = True
+
+    # 동점이면 스킬이 needs 쪽에 더 집중된 유저 우선
+    affinity = np.asarray(matcher.U_skills @ need_vec.T.toarray()).ravel()
+
+    picks: List[Dict] = []
+    residual = gap.copy()
+    for _ in range(slots):
+        gains = A @ residual
+        gains[blocked] = -np.inf
+        i = int(np.argmax(gains + 1e-6 * affinity))
+        if not gains[i] > 0:
+            break
+        newly = A[i].indices[residual[A[i].indices] > 0]
+        picks.append({
+            "user_id": int(matcher.user_ids[i]),
+            "gain": round(float(gains[i] / total), 4),
+            "covers": [terms[j] for j in newly.tolist()],
+        })
+        residual[newly] = 0.0
+        blocked[i] = True
+    return picks
@@ -0,0 +1,119 @@
+# app/recsys/display.py
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+
+# 추천 응답(UserWithSimilarity)에 들어가는 유저 필드
+DISPLAY_FIELDS = (
+    "id",
+    "email",
+    "full_name",
+    "major",
+    "age",
+    "phone_number",
+    "introduction",
+    "profile_image_url",
+    "phone_number_public",
+    "age_public",
+    "skills",
+    "interests",
+)
+
+
+class UserDisplayCache:
+    """
+    추천 결과 화면에 필요한 유저 표시 정보를 컬럼 단위로 들고 있는 캐시.
+
+    추천 매처는 (user_id, similarity)만 돌려주고, 응답에 필요한 필드는 여기서 채움.
+    캐시에 없거나 만료된 유저만 한 번의 쿼리로 DB에서 읽어서 채워 넣음.
+    프로필 수정(crud_user.update_user) 시 invalidate()로 해당 유저만 지우고,
+    다른 워커 프로세스에서 수정된 경우를 위해 ttl_seconds가 지나면 다시 읽음.
+    """
+
+    def __init__(self, ttl_seconds: float = 300) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.slot_by_id: Dict[int, int] = {}
+        self.columns: Dict[str, List[Any]] = {f: [] for f in DISPLAY_FIELDS}
+        self.loaded_at: List[float] = []
+        self._lock = threading.Lock()
+
+    def _fresh(self, slot: int, now: float) -> bool:
+        loaded_at = self.loaded_at[slot]
+        if loaded_at == float("-inf"):  # invalidate() 된 행
+            return False
+        return self.ttl_seconds <= 0 or now - loaded_at <= self.ttl_seconds
+
+    def _put(self, user: User, now: float) -> None:
+        values = {
+            "id": user.id,
+            "email": user.email,
+            "full_name": user.full_name,
+            "major": user.major,
+            "age": user.age,
+            "phone_number": user.phone_number,
+            "introduction": user.introduction,
+            "profile_image_url": user.profile_image_url,
+            "phone_number_public": user.phone_number_public,
+            "age_public": user.age_public,
+            "skills": [{"id": s.id, "name": s.name} for s in user.skills],
+            "interests": [{"id": i.id, "name": i.name} for i in user.interests],
+        }
+        slot = self.slot_by_id.get(user.id)
+        if slot is None:
+            slot = len(self.loaded_at)
+            for field in DISPLAY_FIELDS:
+                self.columns[field].append(values[field])
+            self.loaded_at.append(now)
+            self.slot_by_id[user.id] = slot
+        else:
+            for field in DISPLAY_FIELDS:
+                self.columns[field][slot] = values[field]
+            self.loaded_at[slot] = now
+
+    def _row(self, slot: int) -> Dict[str, Any]:
+        return {field: self.columns[field][slot] for field in DISPLAY_FIELDS}
+
+    def hydrate(self, db: Session, ranked: Iterable[Tuple[int, float]]) -> List[Dict[str, Any]]:
+        """
+        (user_id, similarity) 순위 목록 -> 응답용 dict 목록 (순서 유지, DB에 없는 유저는 스킵).
+        """
+        # crud_user가 이 모듈을 import 하므로 순환 import를 피하려고 여기서 import
+        from app.crud.crud_user import get_multi_by_ids
+
+        ranked = list(ranked)
+        now = time.monotonic()
+        with self._lock:
+            missing = [
+                uid for uid, _ in ranked
+                if uid not in self.slot_by_id or not self._fresh(self.slot_by_id[uid], now)
+            ]
+        if missing:
+            users = get_multi_by_ids(db, ids=missing)
+            with self._lock:
+                for user in users:
+                    self._put(user, now)
+
+        out: List[Dict[str, Any]] = []
+        with self._lock:
+            for uid, sim in ranked:
+                slot = self.slot_by_id.get(uid)
+                if slot is None:
+                    continue
+                row = self._row(slot)
+                row["similarity"] = sim
+                out.append(row)
+        return out
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            slot = self.slot_by_id.get(user_id)
+            if slot is not None:
+                self.loaded_at[slot] = float("-inf")
+
+
+user_display_cache = UserDisplayCache(ttl_seconds=settings.RECSYS_DISPLAY_CACHE_TTL_SECONDS)
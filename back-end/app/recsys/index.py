@@ -0,0 +1,303 @@
+# app/recsys/index.py
+import threading
+import time
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.team import Team
+from app.models.user import User
+from app.recsys.matcher import UserMatcher, MatchConfig
+from app.recsys.positions import PositionIndex, position_rows
+from app.recsys.postings import PostingIndex, user_tokens
+
+
+def _user_row(user: User) -> Dict:
+    """SQLAlchemy User -> UserMatcher 입력 한 행."""
+    return {
+        "user_id": user.id,
+        "name": user.full_name or "",
+        "major": user.major or "",
+        "skills": ";".join([skill.name for skill in user.skills]),
+        "interests": ";".join([interest.name for interest in user.interests]),
+    }
+
+
+def _load_users_columns(db: Session) -> Dict[str, List]:
+    # crud_user가 이 모듈을 import 하므로 순환 import를 피하려고 여기서 import
+    from app.crud.crud_user import get_profile_features
+
+    return get_profile_features(db)
+
+
+def _load_position_rows(db: Session) -> List[Dict]:
+    from app.crud.crud_team import get_open_position_features
+
+    return get_open_position_features(db)
+
+
+class MatcherIndex:
+    """
+    프로세스 전역 UserMatcher 인덱스.
+
+    - 서버 시작 시 DB 전체로 한 번 build 해두고 메모리에 유지
+    - 회원가입 / 프로필 수정 시 upsert_user()로 해당 유저 행만 증분 갱신
+    - (RECSYS_POSTING_CANDIDATES) 스킬/관심사 posting list로 점수 계산 전 후보 유저를 좁힘 (후보가 적을 때만)
+    - vocabulary drift는 백그라운드 스레드가 주기적으로 전체 refit 해서 해소
+      (hashed 모드는 특징 공간이 고정이라 전체 refit 대신 reweight()로 idf만 다시 반영)
+    - 팀 오픈 포지션 인덱스도 같은 vocabulary를 쓰므로 refit 때 함께 다시 build
+
+    요청 스레드 / 백그라운드 잡은 lock 없이 매처를 읽으므로, 한 번 공개한 매처는 바꾸지 않음.
+    증분 갱신 / reweight는 lock 안에서 copy()한 사본에 적용한 뒤 self._matcher 참조 하나만 교체하고,
+    읽는 쪽은 get()으로 받은 매처 하나로 요청을 끝까지 처리 (행렬 / id 배열 / id 맵이 항상 같은 시점).
+    """
+
+    def __init__(self, cfg: Optional[MatchConfig] = None) -> None:
+        self.cfg = cfg or MatchConfig(
+            ann=settings.RECSYS_ANN,
+            features=settings.RECSYS_FEATURES,
+            build_workers=settings.RECSYS_BUILD_WORKERS,
+        )
+        self.version = 0          # 인덱스 내용이 바뀔 때마다 증가
+        self.built_at: Optional[float] = None
+        self._matcher: Optional[UserMatcher] = None
+        self._postings: Optional[PostingIndex] = None
+        self._positions: Optional[PositionIndex] = None
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()  # build는 한 번에 하나만 (pending 목록을 서로 지우지 않도록)
+        self._updates_since_refit = 0
+        self._refitting = False
+        self._pending: Dict[int, Tuple[Dict, Set]] = {}  # refit 도중 들어온 증분 업데이트
+        self._pending_teams: Dict[int, List[Dict]] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._jobs: List[Tuple[Callable[[Optional[UserMatcher]], None], bool]] = []
+        self._job_versions: Dict[int, int] = {}  # 잡 순번 -> 마지막으로 성공한 실행의 인덱스 version
+
+    # ---------- build / 조회 ----------
+
+    def _build_matcher(self, db: Session) -> Optional[UserMatcher]:
+        users = _load_users_columns(db)
+        if not users["user_id"]:
+            return None
+        try:
+            # cfg는 매처가 학습하면서 바꿀 수 있으니 복사본을 넘김
+            return UserMatcher(users, replace(self.cfg))
+        except ValueError:
+            # 토큰이 하나도 없는 경우 (전공/스킬/관심사가 모두 빈 유저뿐)
+            return None
+
+    def build(self, db: Optional[Session] = None) -> Optional[UserMatcher]:
+        """DB 전체로 TF-IDF를 다시 fit 하고 인덱스를 교체. 동시에 호출되면 앞의 build가 끝날 때까지 기다림."""
+        with self._build_lock:
+            return self._build(db)
+
+    def _build(self, db: Optional[Session]) -> Optional[UserMatcher]:
+        with self._lock:
+            self._refitting = True
+            self._pending.clear()
+            self._pending_teams.clear()
+
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            matcher = self._build_matcher(db)
+            postings = PostingIndex.from_db(db) if settings.RECSYS_POSTING_CANDIDATES else None
+            positions = PositionIndex(matcher, _load_position_rows(db)) if matcher is not None else None
+        finally:
+            if own_session:
+                db.close()
+
+        with self._lock:
+            # build 도중 들어온 업데이트는 새 인덱스에 다시 반영
+            for row, tokens in self._pending.values():
+                if matcher is not None:
+                    matcher.upsert_user(**row)
+                if postings is not None:
+                    postings.set_tokens(row["user_id"], tokens)
+            if positions is not None:
+                for team_id, rows in self._pending_teams.items():
+                    positions.set_team(team_id, rows)
+            # 매처를 못 만들었으면 (DB를 읽은 뒤 들어온 프로필일 수 있음) 다음에 다시 build
+            self._updates_since_refit = len(self._pending) if matcher is None else 0
+            self._pending.clear()
+            self._pending_teams.clear()
+            self._refitting = False
+            self._matcher = matcher
+            self._postings = postings
+            self._positions = positions
+            self.built_at = time.time()
+            self.version += 1
+        return matcher
+
+    def reweight(self) -> None:
+        """hashed 모드: 쌓인 증분 업데이트의 문서 빈도를 idf에 반영 (DB 읽기 / 재토큰화 없음)."""
+        with self._lock:
+            if self._matcher is None:
+                return
+            matcher = self._matcher.copy()
+            if matcher.reweight():
+                self._matcher = matcher
+                self._updates_since_refit = 0
+                self.version += 1
+
+    def get(self, db: Optional[Session] = None) -> Optional[UserMatcher]:
+        """
+        현재 인덱스 반환. 한 번도 build 하지 않았을 때만 그 자리에서 build.
+        build 결과가 None(유저가 없거나 전부 빈 프로필)이어도 그대로 None을 돌려주고,
+        이후 회원가입 / 프로필 수정이 들어오면 백그라운드 스레드가 다시 build 함 (요청마다 DB 전체를 읽지 않음).
+        반환된 매처는 이후 갱신에도 바뀌지 않으므로 한 요청 안에서는 이 참조 하나만 쓸 것.
+        """
+        if self.built_at is None:
+            with self._build_lock:
+                if self.built_at is None:
+                    return self._build(db)
+        return self._matcher
+
+    def snapshot(self, db: Optional[Session] = None) -> Tuple[Optional[UserMatcher], int]:
+        """
+        get()과 같지만 (매처, 그 매처의 version)을 lock 안에서 함께 반환.
+        결과를 version 기준으로 캐시할 때 사용 (따로 읽으면 그 사이 갱신으로 짝이 어긋날 수 있음).
+        """
+        self.get(db)
+        with self._lock:
+            return self._matcher, self.version
+
+    def candidates_for(self, user_id: int) -> Optional[np.ndarray]:
+        """
+        user_id와 스킬/관심사를 하나 이상 공유하는 유저 id 배열.
+        posting 후보 생성을 끈 경우, 아직 build 전이거나 후보가 전체 유저의
+        RECSYS_POSTING_MAX_FRACTION을 넘으면 None (= 전체 유저 대상, 그쪽이 더 빠름).
+        """
+        matcher, postings = self._matcher, self._postings
+        if not settings.RECSYS_POSTING_CANDIDATES or postings is None or matcher is None:
+            return None
+        max_count = int(settings.RECSYS_POSTING_MAX_FRACTION * len(matcher.user_ids))
+        return postings.candidates(user_id, max_count=max_count)
+
+    # ---------- 증분 업데이트 ----------
+
+    def upsert_user(self, user: User) -> None:
+        """유저 한 명의 전공/스킬/관심사 변경을 인덱스에 반영."""
+        row = _user_row(user)
+        tokens = user_tokens(user)
+        with self._lock:
+            if self._refitting:
+                self._pending[row["user_id"]] = (row, tokens)
+            if self._postings is not None:
+                self._postings.set_tokens(row["user_id"], tokens)
+            matcher = self._matcher
+
+            if matcher is None:
+                # 아직 매처가 없으면 (빈 DB 등) 다음 깨어날 때 build 하도록 표시
+                self._updates_since_refit += 1
+                if not self._refitting:
+                    self._wake.set()
+                return
+
+            matcher = matcher.copy()
+            matcher.upsert_user(**row)
+            self._matcher = matcher
+            self.version += 1
+            self._updates_since_refit += 1
+            if self._updates_since_refit >= settings.RECSYS_REFIT_MAX_UPDATES:
+                self._wake.set()
+
+    def upsert_team(self, team: Team) -> None:
+        """팀 하나의 오픈 포지션 / 모집 상태 변경을 포지션 인덱스에 반영."""
+        self._set_team(team.id, position_rows(team))
+
+    def remove_team(self, team_id: int) -> None:
+        self._set_team(team_id, [])
+
+    def _set_team(self, team_id: int, rows: List[Dict]) -> None:
+        with self._lock:
+            if self._refitting:
+                self._pending_teams[team_id] = rows
+            if self._positions is not None:
+                self._positions.set_team(team_id, rows)
+
+    def recommend_positions(
+        self,
+        user_id: int,
+        topk: int = 10,
+        exclude_team_ids: Optional[Set[int]] = None,
+    ) -> List[Dict]:
+        """
+        user_id에게 맞는 오픈 포지션 top-k.
+        반환: [{"position_id", "team_id", "similarity"}, ...] (인덱스에 없는 유저면 빈 리스트)
+        """
+        # set_team이 P / active를 교체하는 도중에 읽지 않도록 lock 안에서 계산 (sparse 곱 한 번이라 짧음)
+        with self._lock:
+            matcher, positions = self._matcher, self._positions
+            if matcher is None or positions is None:
+                return []
+            i = matcher.idx_by_id.get(int(user_id))
+            if i is None:
+                return []
+            return positions.topk(matcher.U[i], topk=topk, exclude_team_ids=exclude_team_ids)
+
+    # ---------- 주기적 refit / 배치 잡 ----------
+
+    def add_job(self, fn: Callable[[Optional[UserMatcher]], None], only_on_change: bool = False) -> None:
+        """
+        백그라운드 스레드가 깨어날 때마다 (필요하면 refit 한 다음) 현재 매처로 호출할 잡 등록.
+        등록한 순서대로 실행됨.
+        only_on_change=True면 마지막으로 성공한 실행 이후 인덱스 version이 바뀐 경우에만 실행
+        (전체 유저 추천 재계산처럼 무거운 잡이 아무것도 안 바뀐 시간에도 도는 것을 막음).
+        """
+        self._jobs.append((fn, only_on_change))
+
+    def _run_jobs(self) -> None:
+        with self._lock:
+            matcher, version = self._matcher, self.version
+        for n, (fn, only_on_change) in enumerate(self._jobs):
+            if only_on_change and self._job_versions.get(n) == version:
+                continue
+            try:
+                fn(matcher)
+                self._job_versions[n] = version
+            except Exception as e:
+                print(f"[recsys] job {getattr(fn, '__name__', fn)} failed: {e}")
+
+    def _run(self) -> None:
+        interval = settings.RECSYS_REFIT_INTERVAL_SECONDS
+        # 시작 시점 인덱스 기준으로 한 번 실행 (요청 경로가 아닌 이 스레드에서)
+        self._run_jobs()
+        while not self._stop.is_set():
+            self._wake.wait(timeout=interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if self.built_at is None or self._updates_since_refit > 0:
+                try:
+                    if self._matcher is not None and self.cfg.features == "hashed":
+                        self.reweight()
+                    else:
+                        self.build()
+                except Exception as e:  # 백그라운드 스레드가 죽지 않도록
+                    print(f"[recsys] index refit failed: {e}")
+                    continue
+            self._run_jobs()
+
+    def start(self) -> None:
+        if settings.RECSYS_REFIT_INTERVAL_SECONDS <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="recsys-refit", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+matcher_index = MatcherIndex()
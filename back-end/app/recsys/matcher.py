@@ -1,17 +1,31 @@
 # app/recsys/matcher.py
-from dataclasses import dataclass
+import copy
+import multiprocessing
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Iterable, Sequence
+from typing import List, Dict, Tuple, Optional, Iterable, Mapping, Sequence, Union
 
 import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
 from sklearn.preprocessing import normalize
 
 
+class UserNotIndexedError(ValueError):
+    """질의한 user_id가 인덱스에 없음 (API에서는 404로 변환)."""
+
+
+def _isna(v) -> bool:
+    return v is None or (isinstance(v, float) and np.isnan(v))
+
+
 def _tok(s: str) -> str:
     """전공 / 스킬 / 관심사 문자열을 토큰으로 쪼개서 소문자 공백 구분 문자열로 변환."""
-    if pd.isna(s):
+    if _isna(s):
         return ""
     toks = [t.strip().lower() for t in str(s).replace(",", ";").split(";") if t.strip()]
     return " ".join(toks)
@@ -24,6 +38,20 @@ class MatchConfig:
     w_interests: float = 0.20
     topk: int = 5
     same_person_penalty: float = -1e9
+    # 근사 최근접 이웃 (None이면 전체 유저 brute-force)
+    ann: Optional[str] = None        # "lsh": random-projection LSH
+    lsh_bits: int = 12               # 테이블당 해시 비트 수 (버킷 수 = 2^bits)
+    lsh_tables: int = 16             # 해시 테이블 수 (많을수록 recall ↑, 후보 수 ↑)
+    lsh_multiprobe: bool = True      # 해밍 거리 1인 이웃 버킷까지 탐색
+    ann_seed: int = 42
+    # 병렬 build (프로세스 풀에서 shard 단위로 토큰화 / transform). 1이면 단일 프로세스
+    build_workers: int = 1
+    build_min_shard: int = 25000     # shard당 최소 유저 수 (워커 spawn + import 비용이 1~2초라 작으면 손해)
+    # 특징 공간: "tfidf"는 corpus로 vocabulary를 fit, "hashed"는 고정 크기 해시 공간 + 문서 빈도 직접 관리
+    features: str = "tfidf"
+    hash_features: int = 2 ** 16     # hashed 모드 차원 수 (LSH를 켜면 초평면 행렬도 이 크기에 비례)
+    # topk_for_many 한 chunk의 (chunk x 전체 유저) 점수 계산에 쓸 메모리 상한 (bytes)
+    batch_max_bytes: int = 256 * 2 ** 20
 
     @classmethod
     def from_values(
@@ -49,57 +77,322 @@ class MatchConfig:
         return cls(w_major=wm, w_skills=ws, w_interests=wi, topk=tk)
 
 
+class RandomProjectionLSH:
+    """
+    코사인 유사도용 random-projection LSH (SimHash).
+
+    각 테이블마다 랜덤 초평면 lsh_bits개로 벡터를 비트 코드로 바꾸고,
+    같은 코드(버킷)에 들어간 유저만 후보로 반환. 후보에 대해서만 정확한 점수를 계산함.
+    """
+
+    def __init__(self, dim: int, n_bits: int = 12, n_tables: int = 8, multiprobe: bool = True, seed: int = 42) -> None:
+        rng = np.random.default_rng(seed)
+        self.n_bits = n_bits
+        self.n_tables = n_tables
+        self.multiprobe = multiprobe
+        # (dim, tables * bits) 한 번의 sparse 곱으로 모든 테이블의 투영을 계산
+        self.planes = rng.standard_normal((dim, n_tables * n_bits)).astype(np.float32)
+        self._pow2 = (1 << np.arange(n_bits)).astype(np.int64)
+        self.codes = np.zeros((0, n_tables), dtype=np.int64)
+        self.buckets: List[Dict[int, np.ndarray]] = [dict() for _ in range(n_tables)]
+
+    def _hash(self, X: sp.csr_matrix) -> np.ndarray:
+        """(n, dim) -> (n, tables) 버킷 코드."""
+        proj = np.asarray(X @ self.planes).reshape(X.shape[0], self.n_tables, self.n_bits)
+        return (proj > 0).astype(np.int64) @ self._pow2
+
+    def build(self, X: sp.csr_matrix) -> None:
+        self.codes = self._hash(X)
+        for t in range(self.n_tables):
+            col = self.codes[:, t]
+            order = np.argsort(col, kind="stable")
+            keys, starts = np.unique(col[order], return_index=True)
+            self.buckets[t] = dict(zip(keys.tolist(), np.split(order, starts[1:])))
+
+    def update(self, i: int, row: sp.csr_matrix) -> None:
+        """i번째 행을 추가(i == n) 또는 교체."""
+        new_codes = self._hash(row)[0]
+        if i < len(self.codes):
+            for t, old in enumerate(self.codes[i]):
+                bucket = self.buckets[t].get(int(old))
+                if bucket is not None:
+                    self.buckets[t][int(old)] = bucket[bucket != i]
+            self.codes[i] = new_codes
+        else:
+            self.codes = np.vstack([self.codes, new_codes[None, :]])
+        for t, code in enumerate(new_codes):
+            bucket = self.buckets[t].get(int(code))
+            self.buckets[t][int(code)] = (
+                np.array([i], dtype=np.int64) if bucket is None else np.append(bucket, i)
+            )
+
+    def copy(self) -> "RandomProjectionLSH":
+        """update()가 제자리에서 바꾸는 codes / 버킷 dict만 복사한 사본 (초평면과 버킷 배열은 공유)."""
+        new = copy.copy(self)
+        new.codes = self.codes.copy()
+        new.buckets = [dict(table) for table in self.buckets]
+        return new
+
+    def nbytes(self) -> int:
+        buckets = sum(b.nbytes for table in self.buckets for b in table.values())
+        return self.planes.nbytes + self.codes.nbytes + buckets
+
+    def candidates(self, codes: np.ndarray) -> np.ndarray:
+        """
+        버킷 코드 (tables,)와 같은 버킷(+ multiprobe 이웃 버킷)에 있는 행 인덱스.
+        인덱스에 들어있는 행이면 self.codes[i]를 그대로 넘기면 됨 (다시 해시할 필요 X).
+        """
+        probes = [0]
+        if self.multiprobe:
+            probes += self._pow2.tolist()
+        # np.unique(정렬) 대신 boolean mask로 합집합
+        mask = np.zeros(len(self.codes), dtype=bool)
+        for t, code in enumerate(codes.tolist()):
+            bucket_map = self.buckets[t]
+            for flip in probes:
+                bucket = bucket_map.get(code ^ flip)
+                if bucket is not None:
+                    mask[bucket] = True
+        return np.flatnonzero(mask)
+
+
+class HashedTfidf:
+    """
+    vocabulary 없이 고정 크기 해시 공간을 쓰는 TF-IDF (MatchConfig.features == "hashed").
+
+    토큰 -> 열 번호가 해시로 고정이라 유저가 추가/수정돼도 특징 공간이 바뀌지 않음.
+    문서 빈도(df)는 열마다 직접 세고 add_docs / remove_docs로 토큰 수만큼만 갱신.
+    transform은 마지막 refresh_idf() 시점의 idf(idf_)를 쓰므로 모든 행이 같은 idf 기준이고,
+    refresh_idf()가 돌려주는 (새 idf / 이전 idf) 비율로 기존 행을 다시 가중하면 됨 (UserMatcher.reweight).
+    TfidfVectorizer와 같은 analyzer / sublinear tf / smooth idf / l2 정규화. min_df 필터는 없음.
+    """
+
+    def __init__(self, n_features: int = 2 ** 16, ngram_range: Tuple[int, int] = (1, 2), dtype=np.float32) -> None:
+        self.n_features = n_features
+        self.dtype = dtype
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=ngram_range,
+            alternate_sign=False,
+            norm=None,
+            dtype=dtype,
+        )
+        # 토큰 하나 -> 열 하나 (explain에서 공유 토큰 이름을 찾을 때 사용)
+        self.term_hasher = HashingVectorizer(
+            n_features=n_features,
+            analyzer=_single_term,
+            alternate_sign=False,
+            norm=None,
+            dtype=dtype,
+        )
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self.idf_ = self._idf()
+
+    def _idf(self) -> np.ndarray:
+        idf = np.full(self.n_features, self.n_docs + 1, dtype=self.dtype)
+        idf /= (self.df + 1).astype(self.dtype)
+        np.log(idf, out=idf)
+        idf += 1.0
+        return idf
+
+    def _doc_counts(self, docs: Sequence[str]) -> np.ndarray:
+        X = self.hasher.transform(docs)
+        return np.bincount(X.indices, minlength=self.n_features)  # 행마다 열이 한 번씩만 나옴
+
+    def add_docs(self, docs: Sequence[str]) -> None:
+        self.df += self._doc_counts(docs)
+        self.n_docs += len(docs)
+
+    def remove_docs(self, docs: Sequence[str]) -> None:
+        self.df -= self._doc_counts(docs)
+        self.n_docs -= len(docs)
+
+    def refresh_idf(self) -> np.ndarray:
+        """현재 df로 idf_를 다시 계산하고 (새 idf / 이전 idf) 비율 반환."""
+        idf = self._idf()
+        ratio = idf / self.idf_
+        self.idf_ = idf
+        return ratio
+
+    def copy(self) -> "HashedTfidf":
+        """add_docs / remove_docs가 제자리에서 바꾸는 df만 복사한 사본."""
+        new = copy.copy(self)
+        new.df = self.df.copy()
+        return new
+
+    def build_analyzer(self):
+        return self.hasher.build_analyzer()
+
+    def term_columns(self, terms: Sequence[str]) -> np.ndarray:
+        """analyzer가 만든 term(unigram / bigram) 각각의 열 번호."""
+        if not terms:
+            return np.zeros(0, dtype=np.int64)
+        return self.term_hasher.transform(terms).indices.astype(np.int64)
+
+    def transform(self, docs: Sequence[str]) -> sp.csr_matrix:
+        X = self.hasher.transform(docs)
+        np.log(X.data, out=X.data)
+        X.data += 1.0
+        X.data *= self.idf_[X.indices]
+        return normalize(X)
+
+    def nbytes(self) -> int:
+        return self.df.nbytes + self.idf_.nbytes
+
+
 class UserMatcher:
-    def __init__(self, users_df: pd.DataFrame, cfg: MatchConfig = MatchConfig()) -> None:
+    """
+    전공 / 스킬 / 관심사 TF-IDF 기반 유저 매처.
+
+    users_df: user_id, name, major, skills, interests 컬럼을 가진 DataFrame 또는
+      같은 키의 컬럼 dict (crud_user.get_profile_features 반환값 그대로).
+    프로세스에 오래 떠 있는 인덱스라서 메모리를 아끼도록
+      - 행렬은 전부 float32 CSR, 정규화된 U_* 와 통합 U만 보관 (원본 TF-IDF X_* 는 버림)
+      - 표시용 필드는 DataFrame 대신 user_ids 배열 + 컬럼별 리스트
+    memory_report()로 구성요소별 바이트 수 확인 가능.
+    cfg.features == "hashed"면 vocabulary 대신 HashedTfidf를 써서 특징 공간이 고정됨
+      (upsert_user가 문서 빈도까지 갱신하고, 전체 refit 대신 reweight()로 idf만 다시 반영).
+    upsert_user / reweight는 자기 자신을 바꾸므로, 여러 스레드가 읽는 매처라면
+      copy()한 사본에 적용한 뒤 참조를 통째로 교체해야 함 (MatcherIndex가 그렇게 함).
+    """
+
+    def __init__(self, users_df: Union[pd.DataFrame, Mapping[str, Sequence]], cfg: MatchConfig = MatchConfig()) -> None:
         self.cfg = cfg
-        self.users = users_df.copy()
-
-        # 텍스트 정규화
-        for col in ["major", "skills", "interests"]:
-            self.users[col] = self.users[col].apply(_tok)
-        
-        corpus = (
-            self.users["major"] + " " + self.users["skills"] + " " + self.users["interests"]
-        ).fillna("")
-
-        # ----- TF-IDF 설정 -----
-        # 유저 수가 적으면(min_df=2 쓰면) 모든 토큰이 날아갈 수 있어서
-        # 데이터 개수에 따라 min_df를 완화하고, 그래도 터지면 fallback.
-        min_df = 1 if len(corpus) < 20 else 2  # 유저 적으면 1, 많아지면 2
-        max_df = 1.0                           # 일단 너무 aggressive하게 자르지 않기
-
-        self.vec = TfidfVectorizer(
-            ngram_range=(1, 2),
-            min_df=min_df,
-            max_df=max_df,
-            sublinear_tf=True,
-            norm="l2",
-        )
 
+        # 표시용 필드 (텍스트는 정규화해서 보관)
+        self.user_ids = np.asarray([int(uid) for uid in users_df["user_id"]], dtype=np.int64)
+        self.names = ["" if _isna(v) else str(v) for v in users_df["name"]]
+
+        workers = min(self.cfg.build_workers, len(self.user_ids) // max(self.cfg.build_min_shard, 1))
+        if self.cfg.features == "hashed":
+            self._fit_hashed(users_df)
+        elif self.cfg.features != "tfidf":
+            raise ValueError(f"unknown feature mode '{self.cfg.features}'")
+        elif workers > 1:
+            self._fit_sharded(users_df, workers)
+        else:
+            self._fit(users_df)
+
+        # 가중합 임베딩
+        self._rebuild_U()
+
+        self.idx_by_id = {int(uid): i for i, uid in enumerate(self.user_ids)}
+        self._id_order: Optional[np.ndarray] = None  # user_ids argsort (rows_for_ids용, 필요할 때 계산)
+
+    def _fit(self, users_df) -> None:
+        """단일 프로세스 build: 토큰화 -> TF-IDF fit -> 필드별 transform."""
+        self.majors = [_tok(v) for v in users_df["major"]]
+        self.skills = [_tok(v) for v in users_df["skills"]]
+        self.interests = [_tok(v) for v in users_df["interests"]]
+
+        corpus = [f"{m} {s} {i}" for m, s, i in zip(self.majors, self.skills, self.interests)]
+
+        self.vec = _make_vectorizer(len(corpus))
         try:
-            self.X_all = self.vec.fit_transform(corpus)
+            # vocabulary / idf만 필요하므로 전체 corpus 행렬은 만들지 않음
+            self.vec.fit(corpus)
         except ValueError:
             # "After pruning, no terms remain" 같은 에러 나면
             # 가장 보수적인 설정으로 다시 시도 (유니그램, 필터링 없음)
-            self.vec = TfidfVectorizer(norm="l2")
-            self.X_all = self.vec.fit_transform(corpus)
+            self.vec = _fallback_vectorizer()
+            self.vec.fit(corpus)
 
-        # 필드별 벡터
-        self.X_major = self.vec.transform(self.users["major"])
-        self.X_skills = self.vec.transform(self.users["skills"])
-        self.X_interests = self.vec.transform(self.users["interests"])
+        # 필드별 정규화 벡터
+        self.U_major = normalize(self.vec.transform(self.majors))
+        self.U_skills = normalize(self.vec.transform(self.skills))
+        self.U_interests = normalize(self.vec.transform(self.interests))
 
-        # 정규화
-        self.U_major = normalize(self.X_major)
-        self.U_skills = normalize(self.X_skills)
-        self.U_interests = normalize(self.X_interests)
+    def _fit_hashed(self, users_df) -> None:
+        """hashed 모드 build: 토큰화 -> 문서 빈도 집계 -> 필드별 transform."""
+        self.majors = [_tok(v) for v in users_df["major"]]
+        self.skills = [_tok(v) for v in users_df["skills"]]
+        self.interests = [_tok(v) for v in users_df["interests"]]
 
-        # 가중합 임베딩
-        self._rebuild_U()
+        self.vec = HashedTfidf(self.cfg.hash_features)
+        self.vec.add_docs([f"{m} {s} {i}" for m, s, i in zip(self.majors, self.skills, self.interests)])
+        self.vec.refresh_idf()
+
+        self.U_major = self.vec.transform(self.majors)
+        self.U_skills = self.vec.transform(self.skills)
+        self.U_interests = self.vec.transform(self.interests)
+
+    def _fit_sharded(self, users_df, workers: int) -> None:
+        """
+        프로세스 풀 build. 결과는 _fit과 같음 (vocabulary / idf / 행렬 모두 동일).
 
-        self.users = self.users.reset_index(drop=True)
-        # user_id가 int가 아닐 수도 있어서 한 번 int로 캐스팅
-        self.idx_by_id = {int(uid): i for i, uid in enumerate(self.users["user_id"])}
+        1) 유저를 workers개 shard로 나눠 각 프로세스에서 토큰화 + 문서 빈도(df) 집계
+        2) df를 합쳐서 min_df / max_df 적용 -> vocabulary, idf 계산 (TfidfVectorizer.fit과 같은 식)
+        3) fit된 vectorizer로 각 shard를 다시 병렬 transform 하고 CSR 블록을 세로로 이어붙임
+        서버 안의 스레드에서 호출될 수 있어서 fork 대신 spawn으로 프로세스를 띄움.
+        """
+        cols = [list(users_df[c]) for c in ("major", "skills", "interests")]
+        bounds = np.linspace(0, len(cols[0]), workers + 1).astype(int)
+        shards = [tuple(col[lo:hi] for col in cols) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+        vec = _make_vectorizer(len(cols[0]))
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            tokenized = list(pool.map(_shard_tokenize, [(*shard, vec.ngram_range) for shard in shards]))
+
+            df: Counter = Counter()
+            for *_, shard_df in tokenized:
+                df.update(shard_df)
+            try:
+                _fit_from_df(vec, df, len(cols[0]))
+            except ValueError:
+                vec = _fallback_vectorizer()
+                _fit_from_df(vec, Counter({t: c for t, c in df.items() if " " not in t}), len(cols[0]))
+            self.vec = vec
+
+            blocks = list(pool.map(_shard_transform, [(vec, *shard[:3]) for shard in tokenized]))
+
+        self.majors = [v for shard in tokenized for v in shard[0]]
+        self.skills = [v for shard in tokenized for v in shard[1]]
+        self.interests = [v for shard in tokenized for v in shard[2]]
+        self.U_major, self.U_skills, self.U_interests = (
+            sp.vstack([b[f] for b in blocks], format="csr") for f in range(3)
+        )
+
+    def memory_report(self) -> Dict[str, int]:
+        """구성요소별 대략적인 메모리 사용량 (bytes). 워커 메모리 산정용."""
+        report = {
+            "U": _csr_nbytes(self.U),
+            "U_major": _csr_nbytes(self.U_major),
+            "U_skills": _csr_nbytes(self.U_skills),
+            "U_interests": _csr_nbytes(self.U_interests),
+            "user_ids": self.user_ids.nbytes,
+            "display_fields": sum(
+                _list_nbytes(col) for col in (self.names, self.majors, self.skills, self.interests)
+            ),
+            "idx_by_id": sys.getsizeof(self.idx_by_id) + 28 * 2 * len(self.idx_by_id),
+            "vocabulary": self.vec.nbytes() if isinstance(self.vec, HashedTfidf)
+            else sys.getsizeof(self.vec.vocabulary_)
+            + sum(sys.getsizeof(t) + 28 for t in self.vec.vocabulary_)
+            + self.vec.idf_.nbytes,
+            "ann": self.ann.nbytes() if self.ann is not None else 0,
+        }
+        report["total"] = sum(report.values())
+        return report
+
+    def copy(self) -> "UserMatcher":
+        """
+        증분 업데이트용 사본.
+        행렬 / user_ids는 upsert_user / reweight가 항상 새 객체로 교체하므로 그대로 공유하고,
+        제자리에서 바뀌는 것 (표시용 리스트, idx_by_id, cfg, 해시 df, LSH 버킷)만 복사.
+        """
+        new = copy.copy(self)
+        new.cfg = replace(self.cfg)
+        new.names = list(self.names)
+        new.majors = list(self.majors)
+        new.skills = list(self.skills)
+        new.interests = list(self.interests)
+        new.idx_by_id = dict(self.idx_by_id)
+        if isinstance(self.vec, HashedTfidf):
+            new.vec = self.vec.copy()
+        if self.ann is not None:
+            new.ann = self.ann.copy()
+        return new
 
     # ---------- 내부 유틸 ----------
 
@@ -111,16 +404,195 @@ class UserMatcher:
             + self.cfg.w_interests * self.U_interests
         )
         self.U = normalize(self.U)
+        self._build_ann()
+
+    def _build_ann(self) -> None:
+        """cfg.ann 설정에 따라 근사 최근접 이웃 인덱스 (재)구성."""
+        self.ann: Optional[RandomProjectionLSH] = None
+        if self.cfg.ann is None:
+            return
+        if self.cfg.ann != "lsh":
+            raise ValueError(f"unknown ann backend '{self.cfg.ann}'")
+        self.ann = RandomProjectionLSH(
+            self.U.shape[1],
+            n_bits=self.cfg.lsh_bits,
+            n_tables=self.cfg.lsh_tables,
+            multiprobe=self.cfg.lsh_multiprobe,
+            seed=self.cfg.ann_seed,
+        )
+        self.ann.build(self.U)
+
+    def _field_rows(self, major: str, skills: str, interests: str):
+        """이미 학습된 vocabulary로 한 유저의 필드별 정규화 벡터 + 통합 벡터 계산."""
+        u_major = normalize(self.vec.transform([major]))
+        u_skills = normalize(self.vec.transform([skills]))
+        u_interests = normalize(self.vec.transform([interests]))
+        u = normalize(
+            self.cfg.w_major * u_major
+            + self.cfg.w_skills * u_skills
+            + self.cfg.w_interests * u_interests
+        )
+        return u_major, u_skills, u_interests, u
+
+    def field_sims(self, ii: Sequence[int], jj: Sequence[int]) -> np.ndarray:
+        """
+        (ii[n], jj[n]) 행 인덱스 쌍들의 필드별 코사인 유사도를 한 번에 계산.
+        반환: (n, 3) 배열, 열 순서는 (major, skills, interests).
+
+        쌍마다 행렬곱을 하는 대신 양쪽 행을 모아서 elementwise 곱 후 행 합.
+        """
+        ii = np.asarray(ii, dtype=np.int64)
+        jj = np.asarray(jj, dtype=np.int64)
+        out = np.zeros((len(ii), 3), dtype=np.float64)
+        if len(ii) == 0:
+            return out
+        for col, M in enumerate((self.U_major, self.U_skills, self.U_interests)):
+            out[:, col] = np.asarray(M[ii].multiply(M[jj]).sum(axis=1)).ravel()
+        return out
 
     def _sim_fields(self, i: int, j: int) -> Tuple[float, float, float]:
         """각 필드별 코사인 유사도 (major, skills, interests)."""
-        mj = float((self.U_major[i] @ self.U_major[j].T).toarray()[0, 0])
-        sk = float((self.U_skills[i] @ self.U_skills[j].T).toarray()[0, 0])
-        it = float((self.U_interests[i] @ self.U_interests[j].T).toarray()[0, 0])
-        return mj, sk, it
+        mj, sk, it = self.field_sims([i], [j])[0]
+        return float(mj), float(sk), float(it)
+
+    def _pair_indices(self, pairs: Iterable[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """(user_id, user_id) 쌍 -> 행 인덱스 배열 두 개. 인덱스에 없는 유저가 낀 쌍은 제외."""
+        ii: List[int] = []
+        jj: List[int] = []
+        for a, b in pairs:
+            ia = self.idx_by_id.get(int(a))
+            ib = self.idx_by_id.get(int(b))
+            if ia is None or ib is None:
+                continue
+            ii.append(ia)
+            jj.append(ib)
+        return np.asarray(ii, dtype=np.int64), np.asarray(jj, dtype=np.int64)
+
+    @staticmethod
+    def _weights_from(pos: np.ndarray, neg: np.ndarray, floor: float) -> Dict[str, float]:
+        """수락 평균 유사도 - 거절 평균 유사도로 필드 가중치 계산 (합 = 1)."""
+        d = np.maximum(pos - neg, 0.0) + floor
+        w_major, w_skills, w_interests = (float(x) for x in d / d.sum())
+        return {"w_major": w_major, "w_skills": w_skills, "w_interests": w_interests}
+
+    def _set_weights(self, weights: Dict[str, float]) -> Dict[str, float]:
+        """전역 cfg 가중치를 바꾸고 U 재계산."""
+        self.cfg.w_major, self.cfg.w_skills, self.cfg.w_interests = (
+            weights["w_major"],
+            weights["w_skills"],
+            weights["w_interests"],
+        )
+        self._rebuild_U()
+        return weights
+
+    # ---------- 증분 업데이트 ----------
+
+    def upsert_user(
+        self,
+        user_id: int,
+        name: str = "",
+        major: str = "",
+        skills: str = "",
+        interests: str = "",
+    ) -> None:
+        """
+        유저 한 명을 추가/갱신. TF-IDF vocabulary는 다시 fit하지 않고
+        기존 vocabulary로 transform만 하므로, 새 토큰은 다음 전체 refit 때 반영됨.
+        hashed 모드에서는 새 토큰도 바로 반영되고 문서 빈도도 갱신됨 (idf는 reweight() 때 반영).
+        이 매처를 제자리에서 바꾸므로 다른 스레드가 읽는 중이면 copy()에 적용할 것.
+        """
+        user_id = int(user_id)
+        major, skills, interests = _tok(major), _tok(skills), _tok(interests)
+        i = self.idx_by_id.get(user_id)
+        if isinstance(self.vec, HashedTfidf):
+            if i is not None:
+                self.vec.remove_docs([f"{self.majors[i]} {self.skills[i]} {self.interests[i]}"])
+            self.vec.add_docs([f"{major} {skills} {interests}"])
+        u_major, u_skills, u_interests, u = self._field_rows(major, skills, interests)
+
+        if i is None:
+            self.U_major = sp.vstack([self.U_major, u_major], format="csr")
+            self.U_skills = sp.vstack([self.U_skills, u_skills], format="csr")
+            self.U_interests = sp.vstack([self.U_interests, u_interests], format="csr")
+            self.U = sp.vstack([self.U, u], format="csr")
+            if self.ann is not None:
+                self.ann.update(self.U.shape[0] - 1, u)
+            self.names.append(name or "")
+            self.majors.append(major)
+            self.skills.append(skills)
+            self.interests.append(interests)
+            self.user_ids = np.append(self.user_ids, user_id)
+            self.idx_by_id[user_id] = len(self.user_ids) - 1
+        else:
+            self.U_major = _replace_row(self.U_major, i, u_major)
+            self.U_skills = _replace_row(self.U_skills, i, u_skills)
+            self.U_interests = _replace_row(self.U_interests, i, u_interests)
+            self.U = _replace_row(self.U, i, u)
+            if self.ann is not None:
+                self.ann.update(i, u)
+            self.names[i] = name or ""
+            self.majors[i] = major
+            self.skills[i] = skills
+            self.interests[i] = interests
+
+    def reweight(self) -> bool:
+        """
+        hashed 모드: 지금까지 갱신된 문서 빈도로 idf를 다시 계산해서 모든 행에 반영.
+        행은 정규화된 tf·idf라서 열마다 (새 idf / 이전 idf)를 곱하고 다시 정규화하면
+        새 idf로 처음부터 만든 것과 같음. 토큰화 / 전체 transform 없이 O(nnz).
+        tfidf 모드면 아무것도 안 하고 False (vocabulary가 바뀌므로 전체 refit 필요).
+        """
+        if not isinstance(self.vec, HashedTfidf):
+            return False
+        ratio = self.vec.refresh_idf()
+        fields = []
+        for M in (self.U_major, self.U_skills, self.U_interests):
+            M = M.copy()
+            M.data *= ratio[M.indices]
+            fields.append(normalize(M))
+        self.U_major, self.U_skills, self.U_interests = fields
+        self._rebuild_U()
+        return True
 
     # ---------- 학습(1): 한 유저의 수락/거절 이력 기반 ----------
 
+    def personal_weights(
+        self,
+        target_user_id: int,
+        interactions: List[Tuple[int, int, int]],  # (target, other, label)
+        min_events: int = 2,
+        floor: float = 1e-3,
+    ) -> Optional[Dict[str, float]]:
+        """
+        learn_from_history와 같은 방식으로 target_user_id 한 명의 가중치를 추정만 함.
+        self.cfg / U는 건드리지 않으므로 유저별 가중치로 저장해두고 조회 시 적용하는 용도.
+        이벤트가 min_events보다 적거나 유저가 인덱스에 없으면 None.
+        """
+        i = self.idx_by_id.get(target_user_id)
+        if i is None:
+            return None
+
+        # 한 번에 모아서 필드별 유사도 계산 (쌍마다 sparse 곱 X)
+        others = []
+        labels = []
+        for _, other_uid, label in interactions:
+            j = self.idx_by_id.get(int(other_uid))
+            if j is None or label == 0:
+                continue
+            others.append(j)
+            labels.append(label)
+        labels = np.asarray(labels)
+
+        if len(others) < min_events:
+            return None
+
+        sims = self.field_sims(np.full(len(others), i), others)
+        pos_mask = labels > 0
+        neg_mask = labels < 0
+        pos = sims[pos_mask].mean(axis=0) if pos_mask.any() else np.zeros(3)
+        neg = sims[neg_mask].mean(axis=0) if neg_mask.any() else np.zeros(3)
+        return self._weights_from(pos, neg, floor)
+
     def learn_from_history(
         self,
         target_user_id: int,
@@ -130,71 +602,20 @@ class UserMatcher:
     ) -> Dict[str, float]:
         """
         target_user_id의 팀 수락/거절 기록으로 (전공/스킬/관심사) 가중치 추정.
+        추정한 가중치를 전역 cfg에 반영하고 U를 다시 계산함.
 
         interactions: (target_user_id, other_user_id, label)
           - label = +1 : 수락
           - label = -1 : 거절
         """
-        if target_user_id not in self.idx_by_id:
-            return {
-                "w_major": self.cfg.w_major,
-                "w_skills": self.cfg.w_skills,
-                "w_interests": self.cfg.w_interests,
-            }
-
-        pos_mj = pos_sk = pos_it = 0.0
-        neg_mj = neg_sk = neg_it = 0.0
-        pos_cnt = neg_cnt = 0
-
-        i = self.idx_by_id[target_user_id]
-
-        for _, other_uid, label in interactions:
-            j = self.idx_by_id.get(int(other_uid))
-            if j is None:
-                continue
-            mj, sk, it = self._sim_fields(i, j)
-            if label > 0:
-                pos_mj += mj
-                pos_sk += sk
-                pos_it += it
-                pos_cnt += 1
-            elif label < 0:
-                neg_mj += mj
-                neg_sk += sk
-                neg_it += it
-                neg_cnt += 1
-
-        if (pos_cnt + neg_cnt) < min_events:
+        weights = self.personal_weights(target_user_id, interactions, min_events, floor)
+        if weights is None:
             return {
                 "w_major": self.cfg.w_major,
                 "w_skills": self.cfg.w_skills,
                 "w_interests": self.cfg.w_interests,
             }
-
-        pos_mj /= max(1, pos_cnt)
-        pos_sk /= max(1, pos_cnt)
-        pos_it /= max(1, pos_cnt)
-        neg_mj = (neg_mj / max(1, neg_cnt)) if neg_cnt else 0.0
-        neg_sk = (neg_sk / max(1, neg_cnt)) if neg_cnt else 0.0
-        neg_it = (neg_it / max(1, neg_cnt)) if neg_cnt else 0.0
-
-        d_mj = max(pos_mj - neg_mj, 0.0) + floor
-        d_sk = max(pos_sk - neg_sk, 0.0) + floor
-        d_it = max(pos_it - neg_it, 0.0) + floor
-
-        s = d_mj + d_sk + d_it
-        w_major = d_mj / s
-        w_skills = d_sk / s
-        w_interests = d_it / s
-
-        self.cfg.w_major, self.cfg.w_skills, self.cfg.w_interests = (
-            w_major,
-            w_skills,
-            w_interests,
-        )
-        self._rebuild_U()
-
-        return {"w_major": w_major, "w_skills": w_skills, "w_interests": w_interests}
+        return self._set_weights(weights)
 
     # ---------- 학습(2): 기존 시그니처와 호환되는 API ----------
 
@@ -215,24 +636,13 @@ class UserMatcher:
         """
 
         def avg_sims(pairs: Iterable[Tuple[int, int]]):
-            tot_mj = tot_sk = tot_it = 0.0
-            cnt = 0
-            for a, b in pairs:
-                ia = self.idx_by_id.get(int(a))
-                ib = self.idx_by_id.get(int(b))
-                if ia is None or ib is None:
-                    continue
-                mj, sk, it = self._sim_fields(ia, ib)
-                tot_mj += mj
-                tot_sk += sk
-                tot_it += it
-                cnt += 1
-            if cnt == 0:
-                return 0.0, 0.0, 0.0, 0
-            return tot_mj / cnt, tot_sk / cnt, tot_it / cnt, cnt
-
-        pos_mj, pos_sk, pos_it, pc = avg_sims(pos_pairs)
-        neg_mj, neg_sk, neg_it, nc = avg_sims(neg_pairs)
+            ii, jj = self._pair_indices(pairs)
+            if len(ii) == 0:
+                return np.zeros(3), 0
+            return self.field_sims(ii, jj).mean(axis=0), len(ii)
+
+        pos, pc = avg_sims(pos_pairs)
+        neg, nc = avg_sims(neg_pairs)
 
         if (pc + nc) < min_events:
             if verbose:
@@ -243,60 +653,385 @@ class UserMatcher:
                 "w_interests": self.cfg.w_interests,
             }
 
-        d_mj = max(pos_mj - neg_mj, 0.0) + floor
-        d_sk = max(pos_sk - neg_sk, 0.0) + floor
-        d_it = max(pos_it - neg_it, 0.0) + floor
-
-        s = d_mj + d_sk + d_it
-        w_major = d_mj / s
-        w_skills = d_sk / s
-        w_interests = d_it / s
-
-        self.cfg.w_major, self.cfg.w_skills, self.cfg.w_interests = (
-            w_major,
-            w_skills,
-            w_interests,
-        )
-        self._rebuild_U()
+        weights = self._set_weights(self._weights_from(pos, neg, floor))
 
         if verbose:
             print(
-                f"[learn_weights] -> w_major={w_major:.3f}, "
-                f"w_skills={w_skills:.3f}, w_interests={w_interests:.3f}"
+                f"[learn_weights] -> w_major={weights['w_major']:.3f}, "
+                f"w_skills={weights['w_skills']:.3f}, w_interests={weights['w_interests']:.3f}"
             )
 
-        return {"w_major": w_major, "w_skills": w_skills, "w_interests": w_interests}
+        return weights
+
+    # ---------- 설명 ----------
+
+    def _term_columns(self, terms: Sequence[str]) -> np.ndarray:
+        """term -> 열 번호 (vocabulary에 없으면 -1)."""
+        if isinstance(self.vec, HashedTfidf):
+            return self.vec.term_columns(terms)
+        vocab = self.vec.vocabulary_
+        return np.fromiter((vocab.get(t, -1) for t in terms), dtype=np.int64, count=len(terms))
+
+    def explain(
+        self,
+        user_id: int,
+        other_ids: Sequence[int],
+        weights: Optional[Tuple[float, float, float]] = None,
+        n_tokens: int = 3,
+    ) -> List[Optional[Dict]]:
+        """
+        user_id와 other_ids 각각의 필드별 코사인 + 점수 기여가 큰 공유 토큰 상위 n_tokens개.
+        반환: other_ids 순서의 [{"major", "skills", "interests", "shared_tokens"}, ...]
+          (인덱스에 없는 유저는 None).
+
+        top-k 행을 한 번에 모아서 계산 (결과마다 sparse 행을 따로 다루지 않음)
+          - 필드별 점수: field_sims 한 번
+          - 토큰 기여도: Σ_f w_f · U_f[rows] ⊙ U_f[i] (sparse elementwise 곱), 0이 아닌 열 = 공유 토큰
+          - 행별 상위 토큰: (행, -기여도) lexsort 한 번 후 행 안 순위 < n_tokens만 남김
+          - 열 -> 토큰 이름은 질의 유저 자신의 단어만 매핑 (공유 토큰은 반드시 그 안에 있음)
+        """
+        i = self.idx_by_id.get(int(user_id))
+        out: List[Optional[Dict]] = [None] * len(other_ids)
+        pos = [p for p, uid in enumerate(other_ids) if int(uid) in self.idx_by_id]
+        if i is None or not pos:
+            return out
+        rows = np.array([self.idx_by_id[int(other_ids[p])] for p in pos], dtype=np.int64)
+
+        sims = self.field_sims(np.full(len(rows), i), rows)
+
+        w = weights or (self.cfg.w_major, self.cfg.w_skills, self.cfg.w_interests)
+        fields = (self.U_major, self.U_skills, self.U_interests)
+        analyzer = self.vec.build_analyzer()
+        terms = sorted({
+            t for doc in (self.majors[i], self.skills[i], self.interests[i]) for t in analyzer(doc) if " " not in t
+        })
+        cols = self._term_columns(terms)
+        name_by_col = {c: t for c, t in zip(cols.tolist(), terms) if c >= 0}
+
+        C = sum(wf * F[rows].multiply(F[i]) for wf, F in zip(w, fields)).tocsr()
+        # bigram은 서로 다른 스킬이 공백으로 이어진 것도 섞여 있어서 단어(unigram) 열만 남김
+        C.data[~np.isin(C.indices, list(name_by_col))] = 0
+        C.eliminate_zeros()
+
+        row_of = np.repeat(np.arange(C.shape[0]), np.diff(C.indptr))
+        order = np.lexsort((-C.data, row_of))
+        rank = np.arange(len(order)) - C.indptr[row_of[order]]
+        keep = order[rank < n_tokens]
+        top_cols = np.split(C.indices[keep], np.cumsum(np.bincount(row_of[keep], minlength=C.shape[0]))[:-1])
+
+        for r, p in enumerate(pos):
+            out[p] = {
+                "major": round(float(sims[r, 0]), 4),
+                "skills": round(float(sims[r, 1]), 4),
+                "interests": round(float(sims[r, 2]), 4),
+                "shared_tokens": [name_by_col[c] for c in top_cols[r].tolist() if c in name_by_col],
+            }
+        return out
+
+    # ---------- 필터 ----------
+
+    def mask_for_ids(self, user_ids: Iterable[int]) -> np.ndarray:
+        """user_ids에 속한 행만 True인 bool 배열 (topk_ids의 mask 인자용). 인덱스에 없는 id는 무시."""
+        mask = np.zeros(len(self.user_ids), dtype=bool)
+        rows = [self.idx_by_id[int(u)] for u in user_ids if int(u) in self.idx_by_id]
+        mask[rows] = True
+        return mask
+
+    def rows_for_ids(self, user_ids: Iterable[int]) -> np.ndarray:
+        """
+        user_id 배열 -> 행 인덱스 배열 (인덱스에 없는 id는 제외).
+        id마다 idx_by_id를 찾는 대신 정렬된 user_ids에 searchsorted 한 번.
+        user_ids는 upsert로 뒤에 붙기만 하므로 길이가 같으면 캐시한 argsort를 그대로 씀.
+        """
+        ids = np.asarray(user_ids if isinstance(user_ids, np.ndarray) else list(user_ids), dtype=np.int64)
+        order = self._id_order
+        if order is None or len(order) != len(self.user_ids):
+            order = self._id_order = np.argsort(self.user_ids, kind="stable")
+        if len(ids) == 0 or len(order) == 0:
+            return np.zeros(0, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.user_ids, ids, sorter=order), len(order) - 1)
+        rows = order[pos]
+        return rows[self.user_ids[rows] == ids]
+
+    def major_mask(self, major: str) -> np.ndarray:
+        """전공이 major와 같은 (토큰화 기준, 대소문자 무시) 유저만 True."""
+        key = _tok(major)
+        return np.fromiter((m == key for m in self.majors), dtype=bool, count=len(self.majors))
 
     # ---------- 실제 추천 ----------
 
-    def topk_for(self, user_id: int, topk: Optional[int] = None) -> List[Dict]:
-        """user_id 기준으로 top-k 유저 추천."""
+    def _score(
+        self,
+        i: int,
+        rows: Optional[np.ndarray] = None,
+        weights: Optional[Tuple[float, float, float]] = None,
+    ) -> np.ndarray:
+        """
+        i번째 유저 기준 점수 (rows=None이면 전체 유저).
+
+        weights=(w_major, w_skills, w_interests)가 주어지면 U 대신 필드별 코사인의 가중합.
+        유저별 가중치를 쓸 때 U를 다시 만들 필요 없이 U_* 세 행렬과의 곱만 하면 됨.
+        """
+        if weights is None:
+            M = self.U if rows is None else self.U[rows]
+            return M @ self.U[i].toarray().ravel()
+
+        sims = None
+        for w, F in zip(weights, (self.U_major, self.U_skills, self.U_interests)):
+            M = F if rows is None else F[rows]
+            part = w * (M @ F[i].toarray().ravel())
+            sims = part if sims is None else sims + part
+        return sims
+
+    def _topk_among(
+        self,
+        i: int,
+        cand: np.ndarray,
+        k: int,
+        weights: Optional[Tuple[float, float, float]] = None,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """후보 행들 안에서만 정확한 점수로 top-k. 후보가 k개보다 적으면 None (brute-force로 fallback)."""
+        cand = cand[cand != i]
+        if len(cand) < k:
+            return None
+        sims = self._score(i, cand, weights)
+        part = np.argpartition(-sims, k - 1)[:k]
+        part = part[np.argsort(-sims[part])]
+        return cand[part], sims[part]
+
+    def topk_ids(
+        self,
+        user_id: int,
+        topk: Optional[int] = None,
+        candidate_ids: Optional[Iterable[int]] = None,
+        weights: Optional[Tuple[float, float, float]] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        user_id 기준 top-k를 (user_id 배열, similarity 배열)로 반환. 점수 내림차순.
+        표시용 필드 없이 id / 점수만 필요할 때 (API는 유저 정보를 따로 채움).
+
+        candidate_ids: 점수를 계산할 후보 유저 id (예: 스킬/관심사 posting list로 뽑은 유저).
+          주어지면 그 후보만 점수를 매기고, 없으면 cfg.ann 후보 또는 전체 유저.
+        weights: 이 유저 전용 (w_major, w_skills, w_interests). 없으면 전역 cfg 가중치의 U 사용.
+        mask: 행 순서의 bool 배열 (mask_for_ids / major_mask). False인 유저는 top-k 선택 전에 제외.
+          필터에 걸리는 유저가 k명보다 적으면 k개보다 적게 반환.
+        """
         if user_id not in self.idx_by_id:
-            raise ValueError(f"user_id '{user_id}' not found")
+            raise UserNotIndexedError(f"user_id '{user_id}' not found")
 
         k = topk or self.cfg.topk
         i = self.idx_by_id[user_id]
+        n = self.U.shape[0]
+        if mask is not None and len(mask) < n:
+            # mask를 만든 뒤에 추가된 유저는 제외
+            mask = np.concatenate([mask, np.zeros(n - len(mask), dtype=bool)])
+
+        found = None
+        if candidate_ids is not None:
+            cand = self.rows_for_ids(candidate_ids)
+            found = self._topk_among(i, cand if mask is None else cand[mask[cand]], k, weights)
+        elif self.ann is not None:
+            cand = self.ann.candidates(self.ann.codes[i])
+            found = self._topk_among(i, cand if mask is None else cand[mask[cand]], k, weights)
 
-        sims = (self.U[i] @ self.U.T).toarray().ravel()
-        sims[i] = self.cfg.same_person_penalty  # 자기 자신은 극단적인 음수로 보내버리기
+        if found is not None:
+            order, top_sims = found
+        else:
+            # U.T 변환 없이 CSR 행렬 x dense 벡터
+            sims = self._score(i, weights=weights)
+            sims[i] = self.cfg.same_person_penalty  # 자기 자신은 극단적인 음수로 보내버리기
 
-        order = np.argsort(-sims)[:k]
+            kk = min(k, len(sims) - 1)
+            if mask is not None:
+                valid = mask[:n].copy()
+                valid[i] = False
+                sims[~valid] = -np.inf
+                kk = min(kk, int(valid.sum()))
+            if kk <= 0:
+                return np.zeros(0, dtype=np.int64), np.zeros(0)
+            order = np.argpartition(-sims, kk - 1)[:kk]
+            order = order[np.argsort(-sims[order], kind="stable")]
+            top_sims = sims[order]
 
+        return self.user_ids[order], np.round(top_sims.astype(np.float64), 4)
+
+    def topk_for(
+        self,
+        user_id: int,
+        topk: Optional[int] = None,
+        candidate_ids: Optional[Iterable[int]] = None,
+        weights: Optional[Tuple[float, float, float]] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[Dict]:
+        """
+        user_id 기준으로 top-k 유저 추천 (표시용 필드 포함 dict 목록).
+        인자는 topk_ids와 같음.
+        """
+        ids, sims = self.topk_ids(user_id, topk, candidate_ids, weights, mask)
         out: List[Dict] = []
-        for j in order:
-            row = self.users.iloc[j]
+        for uid, sim in zip(ids.tolist(), sims.tolist()):
+            j = self.idx_by_id[uid]
             out.append(
                 {
-                    "user_id": int(row["user_id"]),
-                    "name": row.get("name", ""),
-                    "major": row.get("major", ""),
-                    "skills": row.get("skills", ""),
-                    "interests": row.get("interests", ""),
-                    "similarity": round(float(sims[j]), 4),
+                    "user_id": uid,
+                    "name": self.names[j],
+                    "major": self.majors[j],
+                    "skills": self.skills[j],
+                    "interests": self.interests[j],
+                    "similarity": sim,
                 }
             )
         return out
 
+    def topk_for_many(
+        self,
+        user_ids: Sequence[int],
+        topk: Optional[int] = None,
+        chunk_size: int = 1024,
+        weights: Optional[Dict[int, Tuple[float, float, float]]] = None,
+    ) -> Dict[int, List[Dict]]:
+        """
+        여러 유저의 top-k를 한 번에 계산 (야간 배치 / 다이제스트용).
+
+        질의 행들을 sparse 블록으로 쌓아 행렬곱 한 번으로 점수를 구하고,
+        전체 정렬 대신 행마다 argpartition으로 top-k만 골라냄.
+        chunk 크기는 chunk_size와, 점수 블록이 cfg.batch_max_bytes 안에 드는 행 수 중 작은 값.
+        셀 하나당 sparse 곱 결과(값 + 열 인덱스) 8 bytes + dense float32 점수 4 bytes
+        + 유저별 가중치 행의 누적 / 임시 블록 8 bytes로 잡음 (argpartition은 한 행씩이라 임시 배열은 O(전체 유저)).
+        없는 user_id는 결과에서 빠짐. 배치용이라 cfg.ann과 관계없이 항상 정확한 점수.
+        weights: user_id -> 유저별 가중치. 해당 유저 행만 필드별 코사인 가중합으로 다시 계산.
+        """
+        k = topk or self.cfg.topk
+        n = self.U.shape[0]
+        k = min(k, n - 1)
+        chunk_size = max(1, min(chunk_size, self.cfg.batch_max_bytes // (20 * max(n, 1))))
+
+        rows = [(int(uid), self.idx_by_id[int(uid)]) for uid in user_ids if int(uid) in self.idx_by_id]
+        out: Dict[int, List[Dict]] = {}
+        if k <= 0:
+            return {uid: [] for uid, _ in rows}
+
+        user_id_arr = self.user_ids
+        UT = self.U.T.tocsr()
+        fields = (self.U_major, self.U_skills, self.U_interests)
+        weights = weights or {}
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            q_idx = np.fromiter((i for _, i in chunk), dtype=np.int64, count=len(chunk))
+
+            sims = (self.U[q_idx] @ UT).toarray()
+
+            # 유저별 가중치가 있는 행만 U_* 세 번의 곱으로 덮어쓰기 (float32 블록 하나에 누적)
+            personal = [r for r, (uid, _) in enumerate(chunk) if uid in weights]
+            if personal:
+                W = np.array([weights[chunk[r][0]] for r in personal], dtype=np.float32)
+                p_idx = q_idx[personal]
+                block = np.zeros((len(personal), n), dtype=np.float32)
+                for f, F in enumerate(fields):
+                    part = (F[p_idx] @ F.T).toarray()
+                    part *= W[:, f:f + 1]
+                    block += part
+                    del part
+                sims[personal] = block
+                del block
+
+            sims[np.arange(len(chunk)), q_idx] = self.cfg.same_person_penalty
+
+            # 행마다 top-k 후보만 뽑고 그 k개 안에서만 정렬 (topk_ids와 같은 연산이라 동점 처리도 같음)
+            for r, (uid, _) in enumerate(chunk):
+                row = sims[r]
+                top = np.argpartition(-row, k - 1)[:k]
+                top = top[np.argsort(-row[top], kind="stable")]
+                out[uid] = [
+                    {"user_id": int(user_id_arr[j]), "similarity": round(float(row[j]), 4)}
+                    for j in top
+                ]
+            del sims
+        return out
+
+
+def _csr_nbytes(M: sp.csr_matrix) -> int:
+    return M.data.nbytes + M.indices.nbytes + M.indptr.nbytes
+
+
+def _list_nbytes(values: List[str]) -> int:
+    return sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+
+
+def _make_vectorizer(n_docs: int) -> TfidfVectorizer:
+    # 유저 수가 적으면(min_df=2 쓰면) 모든 토큰이 날아갈 수 있어서
+    # 데이터 개수에 따라 min_df를 완화하고, 그래도 터지면 fallback.
+    min_df = 1 if n_docs < 20 else 2  # 유저 적으면 1, 많아지면 2
+    max_df = 1.0                      # 일단 너무 aggressive하게 자르지 않기
+    return TfidfVectorizer(
+        ngram_range=(1, 2),
+        min_df=min_df,
+        max_df=max_df,
+        sublinear_tf=True,
+        norm="l2",
+        dtype=np.float32,
+    )
+
+
+def _fallback_vectorizer() -> TfidfVectorizer:
+    return TfidfVectorizer(norm="l2", dtype=np.float32)
+
+
+def _single_term(term: str) -> List[str]:
+    # HashedTfidf.term_hasher용 analyzer (pickle 가능하도록 모듈 함수)
+    return [term]
+
+
+def _shard_tokenize(args):
+    """(병렬 build) shard 하나 토큰화 + 문서 빈도 집계. 프로세스 풀에서 돌아서 모듈 함수로 둠."""
+    majors, skills, interests, ngram_range = args
+    majors = [_tok(v) for v in majors]
+    skills = [_tok(v) for v in skills]
+    interests = [_tok(v) for v in interests]
+    corpus = [f"{m} {s} {i}" for m, s, i in zip(majors, skills, interests)]
+    df: Dict[str, int] = {}
+    try:
+        # TfidfVectorizer와 같은 analyzer, binary=True면 열 합이 곧 문서 빈도
+        cv = CountVectorizer(ngram_range=ngram_range, binary=True)
+        X = cv.fit_transform(corpus)
+        df = dict(zip(cv.get_feature_names_out().tolist(), np.asarray(X.sum(axis=0)).ravel().tolist()))
+    except ValueError:
+        pass  # 토큰이 하나도 없는 shard
+    return majors, skills, interests, df
+
+
+def _shard_transform(args):
+    """(병렬 build) fit된 vectorizer로 shard 하나의 필드별 정규화 벡터 계산."""
+    vec, majors, skills, interests = args
+    return tuple(normalize(vec.transform(col)) for col in (majors, skills, interests))
+
+
+def _fit_from_df(vec: TfidfVectorizer, df: Mapping[str, int], n_docs: int) -> None:
+    """
+    합친 문서 빈도로 vectorizer를 fit 된 상태로 만듦.
+    TfidfVectorizer.fit과 같은 규칙: min_df/max_df 필터, 정렬된 vocabulary,
+    smooth idf = ln((1 + n) / (1 + df)) + 1 (vectorizer dtype으로 계산).
+    """
+    min_count = vec.min_df if isinstance(vec.min_df, int) else vec.min_df * n_docs
+    max_count = vec.max_df if isinstance(vec.max_df, int) else vec.max_df * n_docs
+    terms = sorted(t for t, c in df.items() if min_count <= c <= max_count)
+    if not terms:
+        raise ValueError("After pruning, no terms remain.")
+    vec.vocabulary_ = {t: i for i, t in enumerate(terms)}
+    counts = np.array([df[t] for t in terms], dtype=vec.dtype) + 1
+    idf = np.full_like(counts, n_docs + 1)
+    idf /= counts
+    np.log(idf, out=idf)
+    idf += 1.0
+    vec.idf_ = idf
+
+
+def _replace_row(M: sp.csr_matrix, i: int, row: sp.csr_matrix) -> sp.csr_matrix:
+    """CSR 행렬의 i번째 행을 row로 교체한 새 행렬 반환."""
+    return sp.vstack([M[:i], row, M[i + 1:]], format="csr")
+
 
 def load_users_csv(path: Path) -> pd.DataFrame:
     return pd.read_csv(path, encoding="utf-8")
\ No newline at end of file
@@ -0,0 +1,116 @@
+# app/recsys/positions.py
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from app.models.team import Team, TeamStatus
+from app.recsys.matcher import UserMatcher, _tok
+
+
+def position_rows(team: Team) -> List[Dict]:
+    """
+    팀 하나의 추천 대상 포지션 행 목록.
+    모집 중(RECRUITING)인 공개 팀의, 아직 자리가 남은 포지션만 포함.
+    """
+    if team.status != TeamStatus.RECRUITING or not team.is_public:
+        return []
+    return [
+        {
+            "position_id": p.id,
+            "team_id": team.id,
+            "role_name": p.role_name or "",
+            "required_skills": p.required_skills or "",
+            "description": team.description or "",
+        }
+        for p in team.open_positions
+        if p.filled_count < p.required_count
+    ]
+
+
+class PositionIndex:
+    """
+    팀 오픈 포지션 인덱스.
+
+    포지션마다 (역할명 + required_skills) 와 팀 설명을 UserMatcher와 같은 TF-IDF vocabulary로
+    벡터화해서 행렬 P로 들고 있고, 유저 임베딩 U[i]와 P의 sparse 곱 한 번으로 전체 포지션 점수를 계산.
+    vocabulary가 매처에 묶여 있으므로 매처를 다시 fit 하면 이 인덱스도 다시 build 해야 함
+    (hashed 모드는 특징 공간이 고정이라 매처 reweight() 후에도 그대로 사용).
+
+    팀 수정 / 포지션 추가 시에는 set_team()으로 그 팀 행만 비활성화 후 새 행을 덧붙임
+    (비활성 행은 다음 build 때 정리됨).
+    """
+
+    def __init__(
+        self,
+        matcher: UserMatcher,
+        rows: Iterable[Dict],
+        w_required: float = 0.8,
+        w_description: float = 0.2,
+    ) -> None:
+        self.vec = matcher.vec
+        self.dim = matcher.U.shape[1]
+        self.w_required = w_required
+        self.w_description = w_description
+        rows = list(rows)
+        self.position_ids = np.array([r["position_id"] for r in rows], dtype=np.int64)
+        self.team_ids = np.array([r["team_id"] for r in rows], dtype=np.int64)
+        self.active = np.ones(len(rows), dtype=bool)
+        self.P = self._vectorize(rows)
+        self.rows_by_team: Dict[int, List[int]] = {}
+        for i, team_id in enumerate(self.team_ids.tolist()):
+            self.rows_by_team.setdefault(team_id, []).append(i)
+
+    def _vectorize(self, rows: List[Dict]) -> sp.csr_matrix:
+        if not rows:
+            return sp.csr_matrix((0, self.dim))
+        required = normalize(self.vec.transform([_tok(r["role_name"] + ";" + r["required_skills"]) for r in rows]))
+        description = normalize(self.vec.transform([r["description"].lower() for r in rows]))
+        return sp.csr_matrix(normalize(self.w_required * required + self.w_description * description))
+
+    def set_team(self, team_id: int, rows: List[Dict]) -> None:
+        """팀 하나의 포지션 행을 통째로 교체 (rows가 비면 제거)."""
+        for i in self.rows_by_team.pop(team_id, []):
+            self.active[i] = False
+        if not rows:
+            return
+        start = len(self.position_ids)
+        self.P = sp.vstack([self.P, self._vectorize(rows)], format="csr")
+        self.position_ids = np.concatenate([self.position_ids, [r["position_id"] for r in rows]])
+        self.team_ids = np.concatenate([self.team_ids, [team_id] * len(rows)])
+        self.active = np.concatenate([self.active, np.ones(len(rows), dtype=bool)])
+        self.rows_by_team[team_id] = list(range(start, start + len(rows)))
+
+    def topk(
+        self,
+        q: sp.csr_matrix,
+        topk: int = 10,
+        exclude_team_ids: Optional[Iterable[int]] = None,
+    ) -> List[Dict]:
+        """
+        q: (1, dim) 유저 임베딩 (UserMatcher.U의 한 행).
+        반환: [{"position_id", "team_id", "similarity"}, ...] 점수 내림차순.
+        """
+        if self.P.shape[0] == 0:
+            return []
+        scores = np.asarray((self.P @ q.T).todense()).ravel()
+        mask = ~self.active
+        if exclude_team_ids:
+            mask |= np.isin(self.team_ids, list(exclude_team_ids))
+        scores[mask] = -np.inf
+
+        n_valid = int((~mask).sum())
+        k = min(topk, n_valid)
+        if k <= 0:
+            return []
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        return [
+            {
+                "position_id": int(self.position_ids[i]),
+                "team_id": int(self.team_ids[i]),
+                "similarity": round(float(scores[i]), 4),
+            }
+            for i in idx
+        ]
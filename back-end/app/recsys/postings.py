@@ -0,0 +1,91 @@
+# app/recsys/postings.py
+from collections import defaultdict
+from typing import Dict, FrozenSet, Hashable, Iterable, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.user import User, user_interest_association, user_skill_association
+
+
+def user_tokens(user: User) -> Set[Hashable]:
+    """User 하나의 posting 토큰 집합."""
+    tokens: Set[Hashable] = {("skill", skill.id) for skill in user.skills}
+    tokens.update(("interest", interest.id) for interest in user.interests)
+    return tokens
+
+
+class PostingIndex:
+    """
+    스킬 / 관심사별 posting list (토큰 -> 그 토큰을 가진 user_id 배열).
+
+    추천 점수를 전체 유저에 대해 계산하기 전에, 현재 유저와 토큰을 하나라도
+    공유하는 유저만 후보로 뽑는 용도. 토큰 키는 ("skill", skill_id), ("interest", interest_id).
+
+    - 전공은 토큰에 넣지 않음: 같은 전공 유저가 많아서 후보가 거의 전체 유저가 되고,
+      전공만 겹치는 유저는 점수가 w_major 이하라 top-k에 들 일이 드묾.
+    - 후보가 max_count를 넘으면 None을 돌려서 전체 스캔으로 넘김. 후보가 많으면 후보 행만
+      골라 점수를 매기는 쪽이 전체 행렬곱보다 느림 (recsys-test/bench_postings.py).
+    - posting 배열은 set_tokens에서 새 배열로 교체만 하므로 lock 없이 읽어도 됨.
+
+    TF-IDF는 스킬 이름을 단어 단위로 쪼개므로 ("deep learning" / "machine learning"),
+    id가 달라도 단어가 겹치는 유저는 후보에서 빠질 수 있음 (유사도가 작은 경우라 허용).
+    """
+
+    def __init__(self) -> None:
+        self.postings: Dict[Hashable, np.ndarray] = {}
+        self.tokens_by_user: Dict[int, FrozenSet[Hashable]] = {}
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, Hashable]]) -> "PostingIndex":
+        """(user_id, 토큰) 쌍들로 한 번에 build."""
+        users_by_token: Dict[Hashable, list] = defaultdict(list)
+        tokens_by_user: Dict[int, Set[Hashable]] = defaultdict(set)
+        for user_id, token in pairs:
+            users_by_token[token].append(user_id)
+            tokens_by_user[user_id].add(token)
+        index = cls()
+        index.postings = {t: np.unique(np.asarray(u, dtype=np.int64)) for t, u in users_by_token.items()}
+        index.tokens_by_user = {u: frozenset(t) for u, t in tokens_by_user.items()}
+        return index
+
+    @classmethod
+    def from_db(cls, db: Session) -> "PostingIndex":
+        skills = db.execute(select(user_skill_association.c.user_id, user_skill_association.c.skill_id))
+        interests = db.execute(select(user_interest_association.c.user_id, user_interest_association.c.interest_id))
+        pairs = [(user_id, ("skill", skill_id)) for user_id, skill_id in skills]
+        pairs += [(user_id, ("interest", interest_id)) for user_id, interest_id in interests]
+        return cls.from_pairs(pairs)
+
+    def set_tokens(self, user_id: int, tokens: Iterable[Hashable]) -> None:
+        """유저의 토큰 집합을 통째로 교체 (프로필 수정 시). 바뀐 토큰의 배열만 새로 만듦."""
+        old = self.tokens_by_user.get(user_id, frozenset())
+        new = frozenset(tokens)
+        for token in old - new:
+            users = self.postings[token]
+            self.postings[token] = users[users != user_id]
+        for token in new - old:
+            users = self.postings.get(token)
+            self.postings[token] = (
+                np.array([user_id], dtype=np.int64) if users is None else np.append(users, user_id)
+            )
+        self.tokens_by_user[user_id] = new
+
+    def candidates(self, user_id: int, max_count: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        user_id와 토큰을 하나 이상 공유하는 유저 id 배열 (본인 제외).
+        후보가 max_count명을 넘으면 None (= 후보 단계를 건너뛰고 전체 유저 대상).
+        """
+        tokens = self.tokens_by_user.get(user_id)
+        lists = [self.postings[t] for t in tokens or () if t in self.postings]
+        if not lists:
+            return np.zeros(0, dtype=np.int64)
+        # 합집합은 가장 긴 posting 이상이라 그것만 봐도 넘는지 바로 알 수 있음
+        if max_count is not None and max(len(users) for users in lists) > max_count:
+            return None
+        out = np.unique(np.concatenate(lists))
+        out = out[out != user_id]
+        if max_count is not None and len(out) > max_count:
+            return None
+        return out
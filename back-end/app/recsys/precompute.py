@@ -0,0 +1,56 @@
+# app/recsys/precompute.py
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import settings
+from app.crud import crud_recommendation
+from app.db.session import SessionLocal
+from app.recsys.index import MatcherIndex
+from app.recsys.matcher import UserMatcher
+
+
+def refresh_user_recommendations(
+    matcher: Optional[UserMatcher],
+    topk: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> int:
+    """
+    전체 유저의 top-k를 chunk 단위로 계산해서 user_recommendations 테이블에 저장.
+    computed_at은 계산 시작 시각이라, 이후에 프로필이나 유저별 가중치가 바뀐 유저는 조회 시 stale로 판단됨.
+    저장한 유저 수 반환.
+    """
+    if matcher is None:
+        return 0
+    topk = topk or settings.RECSYS_PRECOMPUTE_TOPK
+    chunk_size = chunk_size or settings.RECSYS_PRECOMPUTE_CHUNK_SIZE
+
+    computed_at = datetime.utcnow()
+    user_ids = list(matcher.idx_by_id.keys())
+
+    db = SessionLocal()
+    try:
+        weights = crud_recommendation.get_all_match_weights(db)
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            recommendations = matcher.topk_for_many(
+                chunk, topk=topk, chunk_size=chunk_size, weights=weights
+            )
+            crud_recommendation.replace_user_recommendations(db, recommendations, computed_at=computed_at)
+    finally:
+        db.close()
+    return len(user_ids)
+
+
+def main() -> None:
+    """
+    API 서버 밖에서 (cron / 별도 워커) 추천 테이블을 한 번 채움.
+    이 프로세스에서 인덱스를 새로 build 하므로 서버의 인덱스 상태와 관계없이 DB 기준 최신 결과.
+    서버 쪽 백그라운드 계산은 RECSYS_PRECOMPUTE_IN_PROCESS=False로 끔.
+    """
+    matcher = MatcherIndex().build()
+    count = refresh_user_recommendations(matcher)
+    print(f"[recsys] stored recommendations for {count} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# app/recsys/training.py
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.crud import crud_recommendation
+from app.db.session import SessionLocal
+from app.models.recommendation import UserInteractionStats, UserMatchWeights
+from app.recsys.matcher import UserMatcher
+
+WATERMARK_NAME = "match_interactions"
+
+
+def train_from_interactions(
+    matcher: Optional[UserMatcher],
+    batch_size: Optional[int] = None,
+    min_events: Optional[int] = None,
+    floor: float = 1e-3,
+) -> int:
+    """
+    match_interactions 로그에서 watermark 이후의 새 이벤트만 읽어 유저별 가중치를 갱신.
+
+    유저마다 수락/거절 상대와의 필드별 유사도 합과 건수를 user_interaction_stats에 누적해두므로
+    전체 이력을 다시 읽지 않고 새 이벤트만큼만 계산함. 유사도는 이벤트를 처리하는 시점의
+    인덱스 기준이고, 인덱스에 없는 유저가 낀 이벤트는 건너뜀.
+    가중치 계산 자체는 UserMatcher.personal_weights와 같음 (수락 평균 - 거절 평균).
+    이벤트가 min_events 미만인 유저는 user_match_weights를 만들지 않음 (전역 가중치 그대로).
+    처리한 이벤트 수 반환.
+    """
+    if matcher is None:
+        return 0
+    batch_size = batch_size or settings.RECSYS_TRAIN_BATCH_SIZE
+    min_events = min_events or settings.RECSYS_TRAIN_MIN_EVENTS
+
+    processed = 0
+    db = SessionLocal()
+    try:
+        last_id = crud_recommendation.get_watermark(db, WATERMARK_NAME)
+        while True:
+            events = crud_recommendation.get_interactions_after(db, last_id, batch_size)
+            if not events:
+                break
+            ids, user_ids, other_ids, labels = (np.asarray(col) for col in zip(*events))
+            last_id = int(ids[-1])
+            processed += len(events)
+
+            keep = (labels != 0) & np.array(
+                [u in matcher.idx_by_id and o in matcher.idx_by_id for u, o in zip(user_ids, other_ids)],
+                dtype=bool,
+            )
+            if keep.any():
+                _accumulate(db, matcher, user_ids[keep], other_ids[keep], labels[keep], min_events, floor)
+            crud_recommendation.set_watermark(db, WATERMARK_NAME, last_id)
+            db.commit()
+    finally:
+        db.close()
+    return processed
+
+
+def _accumulate(db, matcher: UserMatcher, user_ids, other_ids, labels, min_events: int, floor: float) -> None:
+    """배치 하나의 이벤트를 유저별로 합산해서 누적 통계와 가중치를 갱신 (commit은 호출하는 쪽)."""
+    ii = np.fromiter((matcher.idx_by_id[int(u)] for u in user_ids), dtype=np.int64, count=len(user_ids))
+    jj = np.fromiter((matcher.idx_by_id[int(o)] for o in other_ids), dtype=np.int64, count=len(other_ids))
+    sims = matcher.field_sims(ii, jj)
+
+    uniq, inv = np.unique(user_ids, return_inverse=True)
+    is_pos = labels > 0
+    pos_sum = np.zeros((len(uniq), 3))
+    neg_sum = np.zeros((len(uniq), 3))
+    np.add.at(pos_sum, inv[is_pos], sims[is_pos])
+    np.add.at(neg_sum, inv[~is_pos], sims[~is_pos])
+    pos_cnt = np.bincount(inv[is_pos], minlength=len(uniq))
+    neg_cnt = np.bincount(inv[~is_pos], minlength=len(uniq))
+
+    user_list = [int(u) for u in uniq]
+    stats = crud_recommendation.get_interaction_stats_many(db, user_list)
+    weights_rows = crud_recommendation.get_match_weights_many(db, user_list)
+    for k, user_id in enumerate(user_list):
+        row = stats.get(user_id)
+        if row is None:
+            row = UserInteractionStats(
+                user_id=user_id,
+                pos_count=0, neg_count=0,
+                pos_major=0.0, pos_skills=0.0, pos_interests=0.0,
+                neg_major=0.0, neg_skills=0.0, neg_interests=0.0,
+            )
+            db.add(row)
+        row.pos_count += int(pos_cnt[k])
+        row.neg_count += int(neg_cnt[k])
+        row.pos_major += float(pos_sum[k, 0])
+        row.pos_skills += float(pos_sum[k, 1])
+        row.pos_interests += float(pos_sum[k, 2])
+        row.neg_major += float(neg_sum[k, 0])
+        row.neg_skills += float(neg_sum[k, 1])
+        row.neg_interests += float(neg_sum[k, 2])
+
+        if row.pos_count + row.neg_count < min_events:
+            continue
+        pos = np.array([row.pos_major, row.pos_skills, row.pos_interests]) / max(row.pos_count, 1)
+        neg = np.array([row.neg_major, row.neg_skills, row.neg_interests]) / max(row.neg_count, 1)
+        weights = UserMatcher._weights_from(pos, neg, floor)
+
+        db_weights = weights_rows.get(user_id)
+        if db_weights is None:
+            db_weights = UserMatchWeights(user_id=user_id)
+            db.add(db_weights)
+        db_weights.w_major = weights["w_major"]
+        db_weights.w_skills = weights["w_skills"]
+        db_weights.w_interests = weights["w_interests"]
+        db_weights.updated_at = datetime.utcnow()
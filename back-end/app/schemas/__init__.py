@@ -1,4 +1,4 @@
-from .user import User, UserCreate, UserUpdate
+from .user import User, UserCreate, UserUpdate, SimilarityBreakdown
 from .skill import Skill
 from .interest import Interest
 from .token import Token, TokenData
@@ -11,6 +11,9 @@ from .message import (
     ConversationCreate,
     ConversationRead,
     UserReadForMessage,
+    ConversationMarkRead,
+    ReadReceipt,
+    MessagePage,
 )
 from .team import (
     TeamCreate,
@@ -30,3 +33,4 @@ from .notification import (
     NotificationUpdate,
 )
 from .contest import Contest, ContestCreate, ContestUpdate
+from .recommend import RecommendedUserScore, BatchRecommendRequest, BatchRecommendation, RecommendationCacheStats, RecommendedPosition, ComplementaryMember
@@ -63,3 +63,20 @@ class ConversationRead(ConversationBase):
 
     class Config:
         from_attributes = True
+
+class MessagePage(BaseModel):
+    messages: List[MessageRead] # newest first
+    has_more: bool = False
+    # 같은 방향으로 다음 페이지를 받을 때 넘길 id (before_id / after_id 그대로), 없으면 None
+    next_cursor: Optional[int] = None
+
+class ConversationMarkRead(BaseModel):
+    # 생략하면 대화방의 마지막 메시지까지
+    up_to_message_id: Optional[int] = None
+
+class ReadReceipt(BaseModel):
+    # WebSocket으로 보낼 때 새 메시지와 구분하기 위한 값
+    event: str = "read_receipt"
+    conversation_id: int
+    user_id: int
+    last_read_message_id: Optional[int] = None
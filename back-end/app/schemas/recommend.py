@@ -0,0 +1,45 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from .team import OpenPositionRead
+from .user import UserWithSimilarity
+
+
+class RecommendedUserScore(BaseModel):
+    user_id: int
+    similarity: float
+
+
+class BatchRecommendRequest(BaseModel):
+    user_ids: Optional[List[int]] = None # None이면 전체 유저
+    topk: int = Field(5, ge=1, le=100)
+
+
+class BatchRecommendation(BaseModel):
+    user_id: int
+    matches: List[RecommendedUserScore] = []
+
+
+class RecommendationCacheStats(BaseModel):
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    generation: Optional[int] = None # 캐시가 기준으로 삼는 인덱스 version
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    invalidations: int
+
+
+class RecommendedPosition(OpenPositionRead):
+    team_name: str
+    team_description: Optional[str] = None
+    contest_id: Optional[int] = None
+    similarity: float
+
+
+class ComplementaryMember(UserWithSimilarity):
+    # similarity: 팀에 부족한 스킬 중 이 유저가 새로 채우는 비율 (선택 순서 기준 marginal gain)
+    covers: List[str] = []
@@ -62,6 +62,15 @@ class UserUpdate(BaseModel):
     age_public: Optional[bool] = None
 
 
+# 추천 점수 설명 (explain=true일 때만 채워짐)
+class SimilarityBreakdown(BaseModel):
+    major: float
+    skills: float
+    interests: float
+    shared_tokens: List[str] = []
+
+
 # ✅ 추천 결과용 응답 스키마
 class UserWithSimilarity(User):
-    similarity: float
\ No newline at end of file
+    similarity: float
+    breakdown: Optional[SimilarityBreakdown] = None
\ No newline at end of file
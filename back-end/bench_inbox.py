@@ -0,0 +1,141 @@
+import argparse, datetime, json, os, random, tempfile, time
+
+# 대화방 목록(inbox) 조회 쿼리 수 / 시간 측정
+#   legacy : 대화방마다 최신 메시지 + 안 읽은 수 쿼리 (+ participants lazy load)
+#   current: crud_message.get_user_conversations (대화방 수와 관계없이 쿼리 수 고정)
+#   python bench_inbox.py --conversations 10 100 500
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="conversation inbox query-count benchmark")
+    p.add_argument("--conversations", type=int, nargs="+", default=[10, 100, 500])
+    p.add_argument("--messages", type=int, default=20, help="대화방당 메시지 수")
+    p.add_argument("--seed", type=int, default=42)
+    return p.parse_args()
+
+
+def setup_db():
+    """임시 SQLite 사용. app 모듈은 DATABASE_URL 설정 후에 import 해야 함."""
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    import app.api.v1.api  # noqa: F401  (모든 모델 등록)
+    from app.db.base import Base
+    from app.db.session import engine
+
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def seed(db, n_conversations: int, n_messages: int):
+    """유저 1이 n_conversations개의 DM에 참여, 대화방마다 메시지 n_messages개."""
+    from app.models.message import Conversation, ConversationType, Message, conversation_participant_association
+    from app.models.user import User
+
+    db.query(Message).delete()
+    db.execute(conversation_participant_association.delete())
+    db.query(Conversation).delete()
+    db.query(User).delete()
+    db.bulk_insert_mappings(User, [
+        {"id": uid, "email": f"u{uid}@skku.edu", "hashed_password": "x", "full_name": f"U{uid}"}
+        for uid in range(1, n_conversations + 2)
+    ])
+    db.bulk_insert_mappings(Conversation, [
+        {"id": cid, "type": ConversationType.DM, "dm_user_low_id": 1, "dm_user_high_id": cid + 1}
+        for cid in range(1, n_conversations + 1)
+    ])
+    start = datetime.datetime(2026, 1, 1)
+    messages = []
+    for cid in range(1, n_conversations + 1):
+        for k in range(n_messages):
+            messages.append({
+                "id": len(messages) + 1,
+                "content": f"m{k}",
+                "sender_id": random.choice((1, cid + 1)),
+                "conversation_id": cid,
+                "created_at": start + datetime.timedelta(minutes=cid * n_messages + k),
+            })
+    db.bulk_insert_mappings(Message, messages)
+    # 유저 1은 대화방마다 임의의 메시지까지 읽은 상태
+    db.execute(conversation_participant_association.insert(), [
+        {
+            "user_id": uid,
+            "conversation_id": cid,
+            "last_read_message_id": (cid - 1) * n_messages + random.randint(0, n_messages) or None if uid == 1 else None,
+        }
+        for cid in range(1, n_conversations + 1) for uid in (1, cid + 1)
+    ])
+    db.commit()
+
+
+def legacy_inbox(db, user_id: int):
+    """변경 전 get_user_conversations 구조 (대화방마다 쿼리, 비교용). 안 읽은 수는 watermark 기준."""
+    from app.models.message import Conversation, Message, conversation_participant_association as cp
+    from app.models.user import User
+
+    result = []
+    for conv in db.query(Conversation).join(Conversation.participants).filter(User.id == user_id).all():
+        latest_message = db.query(Message).filter(Message.conversation_id == conv.id).order_by(Message.created_at.desc()).first()
+        last_read = db.query(cp.c.last_read_message_id).filter(
+            cp.c.conversation_id == conv.id, cp.c.user_id == user_id
+        ).scalar()
+        unread_count = db.query(Message).filter(
+            Message.conversation_id == conv.id,
+            Message.sender_id != user_id,
+            Message.id > (last_read or 0),
+        ).count()
+        result.append({
+            "id": conv.id,
+            "participants": conv.participants,
+            "latest_message": latest_message,
+            "unread_count": unread_count,
+        })
+    return result
+
+
+def measure(engine, db, fn):
+    """fn(db, 1) 실행 + 응답 직렬화까지의 SQL 문 수 / 시간."""
+    from sqlalchemy import event
+    from app.schemas.message import MessageRead, UserReadForMessage
+
+    statements = []
+    listener = lambda *a: statements.append(a[2])  # noqa: E731
+    db.expire_all()
+    event.listen(engine, "before_cursor_execute", listener)
+    t0 = time.perf_counter()
+    rows = fn(db, 1)
+    summary = sorted(
+        (
+            r["id"],
+            tuple(sorted(UserReadForMessage.model_validate(p).id for p in r["participants"])),
+            MessageRead.model_validate(r["latest_message"]).id if r["latest_message"] else None,
+            r["unread_count"],
+        )
+        for r in rows
+    )
+    elapsed = time.perf_counter() - t0
+    event.remove(engine, "before_cursor_execute", listener)
+    return summary, len(statements), elapsed
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    random.seed(args.seed)
+    engine = setup_db()
+
+    from app.crud.crud_message import crud_message
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    results = []
+    for n in args.conversations:
+        seed(db, n, args.messages)
+        legacy, legacy_queries, legacy_s = measure(engine, db, legacy_inbox)
+        current, current_queries, current_s = measure(engine, db, crud_message.get_user_conversations)
+        assert legacy == current, "inbox rows differ"
+        results.append({
+            "conversations": n,
+            "legacy": {"queries": legacy_queries, "ms": round(legacy_s * 1000, 2)},
+            "current": {"queries": current_queries, "ms": round(current_s * 1000, 2)},
+        })
+    print(json.dumps({"messages_per_conversation": args.messages, "results": results}, indent=2))
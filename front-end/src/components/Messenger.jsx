@@ -137,6 +137,15 @@ const Messenger = () => {
           if (response.ok) {
             const data = await response.json();
             setMessages(data);
+            // 대화방을 열면 마지막 메시지까지 한 번에 읽음 처리
+            fetch(`/api/v1/conversations/${selectedConversation.id}/read`, {
+              method: 'POST',
+              headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${localStorage.getItem('accessToken')}`,
+              },
+              body: JSON.stringify({}),
+            }).catch((error) => console.error('Error marking conversation as read:', error));
           } else {
             console.error('Failed to fetch messages');
           }
@@ -155,6 +164,17 @@ const Messenger = () => {
 
       socket.current.onmessage = (event) => {
         const message = JSON.parse(event.data);
+        if (message.event === 'read_receipt') {
+          // 다른 참여자가 last_read_message_id까지 읽음
+          if (selectedConversation && message.conversation_id === selectedConversation.id) {
+            setMessages((prevMessages) => prevMessages.map((msg) => (
+              msg.id <= message.last_read_message_id && !(msg.read_by || []).includes(message.user_id)
+                ? { ...msg, read_by: [...(msg.read_by || []), message.user_id] }
+                : msg
+            )));
+          }
+          return;
+        }
         if (selectedConversation && message.conversation_id === selectedConversation.id) {
           setMessages((prevMessages) => [...prevMessages, message]);
         }
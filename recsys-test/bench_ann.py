@@ -0,0 +1,86 @@
+import argparse, json, random, sys, time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "back-end"))  # app.recsys.matcher 사용
+
+from app.recsys.matcher import UserMatcher, MatchConfig  # noqa: E402
+from generate_users import make_user  # noqa: E402
+
+# ANN(LSH) vs brute-force: recall@k / 질의 지연시간 비교
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="UserMatcher ANN recall / latency benchmark")
+    p.add_argument("--n_users", type=int, default=20000)
+    p.add_argument("--n_queries", type=int, default=200)
+    p.add_argument("--topk", type=int, default=10)
+    p.add_argument("--bits", type=int, nargs="+", default=[8, 10, 12], help="테이블당 해시 비트 수 후보")
+    p.add_argument("--tables", type=int, nargs="+", default=[8, 16], help="해시 테이블 수 후보")
+    p.add_argument("--seed", type=int, default=42)
+    return p.parse_args()
+
+
+def make_users_df(n: int) -> pd.DataFrame:
+    rows = [make_user(i) for i in range(1, n + 1)]
+    df = pd.DataFrame(rows, columns=["user_id", "name", "major", "skills", "interests"])
+    df["user_id"] = np.arange(1, n + 1)
+    return df
+
+
+def time_queries(matcher: UserMatcher, qids, k: int):
+    results = {}
+    t0 = time.perf_counter()
+    for uid in qids:
+        results[uid] = matcher.topk_for(uid, k)
+    return results, (time.perf_counter() - t0) / len(qids) * 1000
+
+
+def recall_at_k(exact, approx, k: int) -> float:
+    """동점이 많아서 id 교집합 대신, exact k번째 점수 이상인 결과 비율로 계산."""
+    hits = 0
+    for uid, ex in exact.items():
+        kth = ex[-1]["similarity"] if ex else 0.0
+        hits += sum(1 for r in approx[uid] if r["similarity"] >= kth - 1e-6)
+    return hits / (k * len(exact))
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    random.seed(args.seed)
+    users = make_users_df(args.n_users)
+    qids = random.sample(list(users["user_id"]), k=min(args.n_queries, args.n_users))
+
+    t0 = time.perf_counter()
+    exact_m = UserMatcher(users, MatchConfig())
+    build_exact = time.perf_counter() - t0
+    exact, exact_ms = time_queries(exact_m, qids, args.topk)
+
+    report = {
+        "n_users": args.n_users,
+        "topk": args.topk,
+        "exact": {"build_s": round(build_exact, 3), "query_ms": round(exact_ms, 3)},
+        "lsh": [],
+    }
+    for bits in args.bits:
+        for tables in args.tables:
+            cfg = MatchConfig(ann="lsh", lsh_bits=bits, lsh_tables=tables, ann_seed=args.seed)
+            t0 = time.perf_counter()
+            m = UserMatcher(users, cfg)
+            build_s = time.perf_counter() - t0
+            approx, ms = time_queries(m, qids, args.topk)
+            n_cand = np.mean([len(m.ann.candidates(m.ann.codes[m.idx_by_id[uid]])) for uid in qids])
+            report["lsh"].append({
+                "bits": bits,
+                "tables": tables,
+                "build_s": round(build_s, 3),
+                "query_ms": round(ms, 3),
+                "speedup": round(exact_ms / ms, 2),
+                "candidate_frac": round(n_cand / args.n_users, 4),
+                f"recall@{args.topk}": round(recall_at_k(exact, approx, args.topk), 4),
+            })
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,59 @@
+import argparse, json, os, random, sys, time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "back-end"))  # app.recsys.matcher 사용
+
+from app.recsys.matcher import UserMatcher, MatchConfig  # noqa: E402
+from bench_ann import make_users_df  # noqa: E402
+
+# UserMatcher 단일 프로세스 build vs shard 병렬 build (build_workers) 시간 비교
+# 워커 수만큼 코어가 있어야 의미 있는 숫자가 나옴 (결과 JSON에 cpu_count 같이 기록)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="UserMatcher sharded build benchmark")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100000, 300000])
+    p.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    p.add_argument("--repeat", type=int, default=1)
+    p.add_argument("--seed", type=int, default=42)
+    return p.parse_args()
+
+
+def build_time(users, cfg: MatchConfig, repeat: int):
+    best, matcher = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        matcher = UserMatcher(users, cfg)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return matcher, best
+
+
+def identical(a: UserMatcher, b: UserMatcher) -> bool:
+    if a.vec.vocabulary_ != b.vec.vocabulary_ or not np.array_equal(a.vec.idf_, b.vec.idf_):
+        return False
+    return all((getattr(a, f) != getattr(b, f)).nnz == 0 for f in ("U_major", "U_skills", "U_interests", "U"))
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = {"cpu_count": os.cpu_count(), "results": []}
+    for n in args.sizes:
+        random.seed(args.seed)
+        users = make_users_df(n)
+        seq, seq_s = build_time(users, MatchConfig(), args.repeat)
+        row = {"n_users": n, "sequential_s": round(seq_s, 3), "sharded": []}
+        for w in args.workers:
+            # build_min_shard=1: 유저 수와 관계없이 요청한 워커 수 그대로 사용
+            par, par_s = build_time(users, MatchConfig(build_workers=w, build_min_shard=1), args.repeat)
+            row["sharded"].append({
+                "workers": w,
+                "build_s": round(par_s, 3),
+                "speedup": round(seq_s / par_s, 2),
+                "identical": identical(seq, par),
+            })
+        report["results"].append(row)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
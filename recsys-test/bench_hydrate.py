@@ -0,0 +1,127 @@
+import argparse, json, os, random, sys, tempfile, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "back-end"))  # app.* 사용
+
+# /recommend 한 번에 드는 비용 비교 (k=50 기준)
+#  - dicts : topk_for로 표시 필드 dict 조립 -> get_multi_by_ids로 User 로드 -> UserWithSimilarity 생성 (기존 경로)
+#  - cold  : topk_ids(id/점수 배열) -> UserDisplayCache.hydrate, 캐시가 빈 상태 (매번 DB 1번)
+#  - warm  : topk_ids -> UserDisplayCache.hydrate, 캐시에 이미 있는 상태 (DB 접근 없음)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="recommendation result assembly / hydration benchmark")
+    p.add_argument("--n_users", type=int, default=10000)
+    p.add_argument("--n_queries", type=int, default=200)
+    p.add_argument("--topk", type=int, default=50)
+    p.add_argument("--seed", type=int, default=42)
+    return p.parse_args()
+
+
+def setup_db(n_users: int, seed: int):
+    """임시 SQLite에 합성 유저 n명 생성. app 모듈은 DATABASE_URL 설정 후에 import 해야 함."""
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    import app.api.v1.api  # noqa: F401  (모든 모델 등록)
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.interest import Interest
+    from app.models.skill import Skill
+    from app.models.user import User, user_interest_association, user_skill_association
+    from generate_users import INTERESTS, SKILLS, make_user
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([Skill(name=s) for s in SKILLS] + [Interest(name=i) for i in INTERESTS])
+    db.commit()
+    skill_id = {s.name: s.id for s in db.query(Skill)}
+    interest_id = {i.name: i.id for i in db.query(Interest)}
+
+    random.seed(seed)
+    users, us, ui = [], [], []
+    for uid in range(1, n_users + 1):
+        _, name, major, skills, interests = make_user(uid)
+        users.append({"id": uid, "email": f"u{uid}@skku.edu", "hashed_password": "x", "full_name": name, "major": major})
+        us += [{"user_id": uid, "skill_id": skill_id[s]} for s in skills.split(";")]
+        ui += [{"user_id": uid, "interest_id": interest_id[i]} for i in interests.split(";")]
+    db.bulk_insert_mappings(User, users)
+    db.execute(user_skill_association.insert(), us)
+    db.execute(user_interest_association.insert(), ui)
+    db.commit()
+    return db
+
+
+def per_request_ms(fn, qids) -> float:
+    t0 = time.perf_counter()
+    for uid in qids:
+        fn(uid)
+    return (time.perf_counter() - t0) / len(qids) * 1000
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    db = setup_db(args.n_users, args.seed)
+
+    from app.crud.crud_user import get_multi_by_ids
+    from app.recsys.display import UserDisplayCache
+    from app.recsys.index import matcher_index
+    from app.schemas.user import UserWithSimilarity
+
+    matcher = matcher_index.build(db)
+    qids = random.sample(list(matcher.idx_by_id), k=min(args.n_queries, args.n_users))
+    k = args.topk
+
+    fields = ("id", "email", "full_name", "major", "age", "phone_number", "introduction",
+              "profile_image_url", "phone_number_public", "age_public")
+
+    def dicts_path(uid):
+        info = matcher.topk_for(uid, topk=k)
+        users = {u.id: u for u in get_multi_by_ids(db, ids=[r["user_id"] for r in info])}
+        out = []
+        for r in info:
+            u = users[r["user_id"]]
+            out.append(UserWithSimilarity(
+                **{f: getattr(u, f) for f in fields},
+                skills=list(u.skills),
+                interests=list(u.interests),
+                similarity=r["similarity"],
+            ))
+        return out
+
+    def hydrate_path(cache):
+        def run(uid):
+            ids, sims = matcher.topk_ids(uid, topk=k)
+            return cache.hydrate(db, zip(ids.tolist(), sims.tolist()))
+        return run
+
+    def cold_run(uid):
+        # 요청마다 빈 캐시 (DB 읽기 포함 비용)
+        return hydrate_path(UserDisplayCache())(uid)
+
+    # 결과 동일성 확인
+    a = dicts_path(qids[0])
+    b = hydrate_path(UserDisplayCache())(qids[0])
+    assert [(u.id, u.similarity) for u in a] == [(r["id"], r["similarity"]) for r in b]
+
+    warm_cache = UserDisplayCache(ttl_seconds=0)
+    for uid in qids:
+        hydrate_path(warm_cache)(uid)
+
+    matcher_only = {
+        "topk_for_ms": per_request_ms(lambda uid: matcher.topk_for(uid, topk=k), qids),
+        "topk_ids_ms": per_request_ms(lambda uid: matcher.topk_ids(uid, topk=k), qids),
+    }
+    report = {
+        "n_users": args.n_users,
+        "topk": k,
+        "n_queries": len(qids),
+        "matcher": {name: round(v, 3) for name, v in matcher_only.items()},
+        "request_ms": {
+            "dicts_db_pydantic": round(per_request_ms(dicts_path, qids), 3),
+            "ids_hydrate_cold": round(per_request_ms(cold_run, qids), 3),
+            "ids_hydrate_warm": round(per_request_ms(hydrate_path(warm_cache), qids), 3),
+        },
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,118 @@
+import argparse, json, random, sys, time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "back-end"))  # app.recsys 사용
+
+from app.recsys.matcher import UserMatcher, MatchConfig  # noqa: E402
+from app.recsys.postings import PostingIndex  # noqa: E402
+from bench_ann import make_users_df  # noqa: E402
+
+# posting list 후보 단계 vs 전체 스캔: 질의당 지연시간 / 후보 비율 / recall 비교
+# - generate: generate_users.py 분포 (스킬 31개, 관심사 18개 -> 거의 모든 유저가 토큰을 공유)
+# - longtail: 스킬/관심사 vocabulary가 크고 Zipf 분포 (카탈로그가 큰 실서비스 가정)
+# max_fraction마다 후보가 그 비율을 넘는 질의는 전체 스캔으로 넘어감 (MatcherIndex.candidates_for와 같음)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="posting-list candidate stage benchmark")
+    p.add_argument("--n_users", type=int, default=20000)
+    p.add_argument("--n_queries", type=int, default=300)
+    p.add_argument("--topk", type=int, default=10)
+    p.add_argument("--datasets", nargs="+", default=["generate", "longtail"])
+    p.add_argument("--vocab", type=int, default=5000, help="longtail 스킬/관심사 vocabulary 크기")
+    p.add_argument("--fractions", type=float, nargs="+", default=[0.02, 0.05, 0.1, 0.25, 1.0])
+    p.add_argument("--seed", type=int, default=42)
+    return p.parse_args()
+
+
+def make_longtail_df(n: int, vocab: int) -> pd.DataFrame:
+    rng = np.random.default_rng(random.randint(0, 2 ** 31))
+    weights = 1.0 / np.arange(1, vocab + 1)
+    weights /= weights.sum()
+
+    def pick(prefix: str) -> str:
+        idx = rng.choice(vocab, size=rng.integers(2, 6), replace=False, p=weights)
+        return ";".join(f"{prefix}{i}" for i in idx)
+
+    return pd.DataFrame({
+        "user_id": np.arange(1, n + 1),
+        "name": [f"User{i}" for i in range(1, n + 1)],
+        "major": [f"major{i}" for i in rng.integers(0, 10, size=n)],
+        "skills": [pick("skill") for _ in range(n)],
+        "interests": [pick("topic") for _ in range(n)],
+    })
+
+
+def make_postings(users: pd.DataFrame) -> PostingIndex:
+    pairs = []
+    for uid, skills, interests in zip(users["user_id"], users["skills"], users["interests"]):
+        pairs += [(int(uid), ("skill", s.strip().lower())) for s in skills.split(";") if s.strip()]
+        pairs += [(int(uid), ("interest", s.strip().lower())) for s in interests.split(";") if s.strip()]
+    return PostingIndex.from_pairs(pairs)
+
+
+def run(matcher: UserMatcher, postings: PostingIndex, qids, k: int, max_fraction):
+    """질의당 평균 ms (후보 생성 포함), 후보 단계를 실제로 쓴 질의 비율, 후보 비율 평균, 정확한 top-k 대비 recall."""
+    n = len(matcher.user_ids)
+    max_count = None if max_fraction is None else int(max_fraction * n)
+    used, sizes, results = 0, [], {}
+    t0 = time.perf_counter()
+    for uid in qids:
+        cand = None
+        if max_fraction is not None:
+            cand = postings.candidates(uid, max_count=max_count)
+            if cand is not None:
+                used += 1
+                sizes.append(len(cand) / n)
+        results[uid] = matcher.topk_ids(uid, k, candidate_ids=cand)
+    ms = (time.perf_counter() - t0) / len(qids) * 1000
+    return ms, used / len(qids), float(np.mean(sizes)) if sizes else None, results
+
+
+def recall(exact, approx, k: int) -> float:
+    """동점이 많아서 id 교집합 대신, exact k번째 점수 이상인 결과 비율로 계산."""
+    hits = 0
+    for uid, (_, ex) in exact.items():
+        kth = ex[-1] if len(ex) else 0.0
+        hits += int((approx[uid][1] >= kth - 1e-6).sum())
+    return hits / (k * len(exact))
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = {"n_users": args.n_users, "n_queries": args.n_queries, "topk": args.topk, "datasets": []}
+    for name in args.datasets:
+        random.seed(args.seed)
+        users = make_users_df(args.n_users) if name == "generate" else make_longtail_df(args.n_users, args.vocab)
+        matcher = UserMatcher(users, MatchConfig())
+        postings = make_postings(users)
+        qids = random.sample(list(map(int, users["user_id"])), args.n_queries)
+
+        # 캐시 / 첫 호출 비용 제외
+        run(matcher, postings, qids[:20], args.topk, 1.0)
+        brute_ms, _, _, exact = run(matcher, postings, qids, args.topk, None)
+        uncapped = postings.candidates  # 상한 없이 후보 비율만 측정
+        all_sizes = [len(c) / args.n_users for c in (uncapped(uid) for uid in qids)]
+
+        row = {
+            "dataset": name,
+            "brute_force_ms": round(brute_ms, 3),
+            "candidate_fraction_mean": round(float(np.mean(all_sizes)), 3),
+            "stages": [],
+        }
+        for frac in args.fractions:
+            ms, used, size, res = run(matcher, postings, qids, args.topk, frac)
+            row["stages"].append({
+                "max_fraction": frac,
+                "query_ms": round(ms, 3),
+                "speedup": round(brute_ms / ms, 2),
+                "stage_used": round(used, 3),
+                "candidate_fraction_used": None if size is None else round(size, 3),
+                "recall": round(recall(exact, res, args.topk), 4),
+            })
+        report["datasets"].append(row)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
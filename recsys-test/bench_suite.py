@@ -0,0 +1,111 @@
+import argparse, json, platform, random, sys, time
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "back-end"))  # app.recsys.matcher 사용
+
+from app.recsys.matcher import UserMatcher, MatchConfig  # noqa: E402
+from bench_ann import make_users_df, recall_at_k  # noqa: E402
+
+# app/recsys/matcher.py 회귀 측정용 벤치마크 모음
+# 유저 수별로 build / 단건 top-k / 배치 top-k / 가중치 학습 시간, 메모리, 근사 모드 recall@k 를 JSON으로 출력
+#   python bench_suite.py                       # 1k / 10k / 100k
+#   python bench_suite.py --sizes 1000 --out result.json
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="UserMatcher benchmark suite (JSON output)")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    p.add_argument("--n_queries", type=int, default=200, help="단건 top-k / recall 측정에 쓸 질의 유저 수")
+    p.add_argument("--batch", type=int, default=1000, help="배치 top-k 측정에 쓸 유저 수")
+    p.add_argument("--topk", type=int, default=10)
+    p.add_argument("--n_pairs", type=int, default=2000, help="가중치 학습에 쓸 수락/거절 쌍 수 (각각)")
+    p.add_argument("--approx", nargs="*", default=["lsh"], help="recall을 잴 근사 모드 (MatchConfig.ann 값)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", type=Path, default=None, help="결과 JSON 저장 경로 (없으면 stdout)")
+    return p.parse_args()
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def build(users, cfg: MatchConfig):
+    return timed(lambda: UserMatcher(users, cfg))
+
+
+def single_topk(matcher: UserMatcher, qids, k: int):
+    results, secs = timed(lambda: {uid: matcher.topk_for(uid, k) for uid in qids})
+    return results, secs / len(qids) * 1000
+
+
+def bench_size(n: int, args) -> dict:
+    random.seed(args.seed)
+    users = make_users_df(n)
+    ids = list(users["user_id"])
+    qids = random.sample(ids, k=min(args.n_queries, n))
+    batch_ids = random.sample(ids, k=min(args.batch, n))
+
+    exact, build_s = build(users, MatchConfig())
+    exact_results, single_ms = single_topk(exact, qids, args.topk)
+    _, batch_s = timed(lambda: exact.topk_for_many(batch_ids, topk=args.topk))
+
+    # 가중치 학습: 랜덤 쌍 (벡터화된 field_sims 경로 성능만 봄)
+    pairs = lambda: [tuple(random.sample(ids, 2)) for _ in range(args.n_pairs)]  # noqa: E731
+    pos, neg = pairs(), pairs()
+    _, learn_s = timed(lambda: exact.learn_weights(pos, neg))
+    target = qids[0]
+    history = [(target, o, random.choice((1, -1))) for o in random.sample(ids, k=min(200, n))]
+    _, personal_s = timed(lambda: exact.personal_weights(target, history))
+
+    result = {
+        "n_users": n,
+        "exact": {
+            "build_s": round(build_s, 3),
+            "single_topk_ms": round(single_ms, 3),
+            "batch_topk_ms_per_user": round(batch_s / len(batch_ids) * 1000, 4),
+            "learn_weights_ms": round(learn_s * 1000, 3),
+            "personal_weights_ms": round(personal_s * 1000, 3),
+            "memory_bytes": exact.memory_report(),
+        },
+        "approx": {},
+    }
+
+    for mode in args.approx:
+        cfg = MatchConfig(ann=mode, ann_seed=args.seed)
+        m, build_s = build(users, cfg)
+        approx_results, ms = single_topk(m, qids, args.topk)
+        result["approx"][mode] = {
+            "config": {k: v for k, v in asdict(cfg).items() if k.startswith(("lsh_", "ann"))},
+            "build_s": round(build_s, 3),
+            "single_topk_ms": round(ms, 3),
+            "speedup": round(single_ms / ms, 2) if ms else None,
+            f"recall@{args.topk}": round(recall_at_k(exact_results, approx_results, args.topk), 4),
+            "memory_bytes": m.memory_report(),
+        }
+    return result
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "topk": args.topk,
+            "n_queries": args.n_queries,
+            "seed": args.seed,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": [bench_size(n, args) for n in args.sizes],
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out is not None:
+        args.out.write_text(text, encoding="utf-8")
+    print(text)